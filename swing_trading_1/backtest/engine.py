@@ -12,8 +12,8 @@ DB contract
 
 All funnel logic is in-memory using existing pure functions:
 
-  src.impulse_finder.find_impulses()       — reads candles, returns ImpulseSignal list
-  src.funnel_processor.compute_funnel_state() — reads candles, returns FunnelSnapshot list
+  _load_impulse_candidates()               — one range scan, ImpulseSignals per date
+  src.funnel_processor.compute_funnel_state_range() — one walk, snapshots for every date
   src.conditions.*                         — Strategy Pattern, zero I/O
 
 Usage
@@ -25,7 +25,6 @@ Usage
 from __future__ import annotations
 
 import argparse
-import datetime as dt
 import sys
 import time
 from datetime import date
@@ -34,14 +33,15 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import duckdb
+import polars as pl
 
 from config import (
     INTERVAL, DB_PATH,
     IMPULSE_THRESHOLD, CONSOLIDATION_DAYS,
     STABLE_MAX_UP_PCT, STABLE_MAX_DOWN_PCT,
 )
-from src.impulse_finder import find_impulses
-from src.funnel_processor import compute_funnel_state
+from src.db import ensure_migrated
+from src.funnel_processor import compute_funnel_state_range
 from src.conditions import StabilityCondition, VolumeCondition
 from src.models import ImpulseSignal, StockState
 
@@ -53,21 +53,49 @@ def _open_readonly(db_path: str) -> duckdb.DuckDBPyConnection:
             f"DB not found: {db_path}\n"
             "Run 'python -m src.ingestor --lookback N' first to load candles."
         )
+    # Files ingested before trade_date existed would otherwise fail the
+    # queries below; a no-op on an up-to-date file.
+    ensure_migrated(db_path)
     return duckdb.connect(db_path, read_only=True)
 
 _W   = 56
 _SEP = "━" * _W
 
-_CONDITIONS = [
+_CONDITIONS = (
     StabilityCondition(max_up_pct=STABLE_MAX_UP_PCT, max_down_pct=STABLE_MAX_DOWN_PCT),
     VolumeCondition(hard=False),
-]
+)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Canonical statement text (see the SQL-constants note in src/db.py); the
+# bigger win was collapsing the per-day queries into the two below.
+_TRADING_DATES_SQL = """
+    SELECT DISTINCT trade_date
+    FROM   candles
+    WHERE  interval = ?
+      AND  trade_date BETWEEN ? AND ?
+    ORDER  BY 1
+"""
+
+_IMPULSE_CANDIDATES_SQL = """
+    SELECT
+        ticker,
+        trade_date,
+        open,
+        close,
+        ((close - open) / open * 100)  AS change_pct
+    FROM candles
+    WHERE trade_date BETWEEN ? AND ?
+      AND interval = ?
+      AND open > 0
+      AND (close - open) / open * 100 >= ?
+"""
+
+
 def _trading_dates(
     conn:      duckdb.DuckDBPyConnection,
     from_date: date,
@@ -75,16 +103,69 @@ def _trading_dates(
     interval:  str,
 ) -> list[date]:
     """Return sorted distinct trading dates present in candles within range."""
-    rows = conn.execute("""
-        SELECT DISTINCT CAST(datetime AS DATE) AS d
-        FROM   candles
-        WHERE  CAST(datetime AS DATE) BETWEEN ? AND ?
-          AND  interval = ?
-        ORDER  BY d
-    """, [from_date, to_date, interval]).fetchall()
+    rows = conn.execute(_TRADING_DATES_SQL, [interval, from_date, to_date]).fetchall()
     return [r[0] for r in rows]
 
 
+def _load_impulse_candidates(
+    conn:      duckdb.DuckDBPyConnection,
+    from_date: date,
+    to_date:   date,
+    threshold: float,
+    interval:  str,
+) -> dict[date, list[ImpulseSignal]]:
+    """
+    Detect every impulse in [from_date, to_date] with ONE columnar scan.
+
+    The per-day loop used to call find_impulses() once per trading day —
+    40+ full scans of candles for a 2-month backtest. DuckDB is built for
+    range scans, so pull the whole window in a single query and partition
+    by date in Polars. The loop then does a dict lookup per day instead of
+    a round trip.
+    """
+    df: pl.DataFrame = conn.execute(
+        _IMPULSE_CANDIDATES_SQL, [from_date, to_date, interval, threshold]
+    ).pl()
+
+    by_date: dict[date, list[ImpulseSignal]] = {}
+    for (d,), day_df in df.group_by("trade_date"):
+        by_date[d] = [
+            ImpulseSignal(
+                ticker=row["ticker"],
+                trade_date=row["trade_date"],
+                open=round(row["open"], 2),
+                close=round(row["close"], 2),
+                change_pct=round(row["change_pct"], 2),
+                direction="BULL",
+                interval=interval,
+            )
+            for row in day_df.to_dicts()
+        ]
+    return by_date
+
+
+def load_impulse_candidates(
+    from_date: date,
+    to_date:   date,
+    threshold: float,
+    interval:  str = INTERVAL,
+    db_path:   str = DB_PATH,
+) -> dict[date, list[ImpulseSignal]]:
+    """
+    Standalone impulse-candidate loader for callers without a connection.
+
+    Opens its own read-only connection and runs the same single-scan
+    detection as run_backtest. The trainer uses this to detect once per
+    threshold and share the result across every (days, up, down) combo —
+    run_backtest accepts the dict via its impulses_by_date parameter.
+    """
+    conn = _open_readonly(db_path)
+    try:
+        return _load_impulse_candidates(conn, from_date, to_date, threshold, interval)
+    finally:
+        conn.close()
+
+
 # ---------------------------------------------------------------------------
 # Main simulation
 # ---------------------------------------------------------------------------
@@ -98,6 +179,8 @@ def run_backtest(
     threshold:          float  = IMPULSE_THRESHOLD,
     db_path:            str    = DB_PATH,
     out                        = None,
+    impulses_by_date:   dict[date, list[ImpulseSignal]] | None = None,
+    conn:               duckdb.DuckDBPyConnection | None = None,
 ) -> dict:
     """
     Full day-by-day backtest — read-only.
@@ -108,128 +191,158 @@ def run_backtest(
     Steps
     -----
     1. Verify candles exist for the requested range.
-    2. For each trading day D:
-         a. find_impulses(D)             — reads candles
-         b. compute_funnel_state(D)      — reads candles
+    2. Detect every impulse in the range with one scan.
+    3. For each trading day D:
+         a. look up today's impulses    — in-memory dict
+         b. compute_funnel_state(D)     — reads candles
          c. Print: Day 0 / Consolidating / Watchlist / Fallouts
     """
-    p       = lambda *a, **kw: print(*a, file=(out or sys.stdout), **kw)  # noqa: E731
-    t_start = time.time()
-    conn    = _open_readonly(db_path)
-
-    p(_SEP)
-    p(f"  BACKTEST  ·  {from_date} → {to_date}")
-    p(f"  interval {interval}  ·  threshold ≥ {threshold}%  ·  read-only")
-    p(_SEP)
+    # Output is buffered per day and emitted as one joined write. A 250-day
+    # run makes thousands of p(...) calls; one write per day block keeps the
+    # report identical while collapsing the syscall count by ~50x.
+    sink = out or sys.stdout
+    buf: list[str] = []
+    add = buf.append
+
+    def flush() -> None:
+        if buf:
+            print("\n".join(buf), file=sink)
+            buf.clear()
+
+    # Callers running many backtests (the trainer's process pool) pass a
+    # long-lived read-only connection so DuckDB's buffer cache survives
+    # across calls; it stays open when borrowed.
+    t_start   = time.time()
+    owns_conn = conn is None
+    if owns_conn:
+        conn = _open_readonly(db_path)
+
+    add(_SEP)
+    add(f"  BACKTEST  ·  {from_date} → {to_date}")
+    add(f"  interval {interval}  ·  threshold ≥ {threshold}%  ·  read-only")
+    add(_SEP)
 
     # ── 1. Verify candles are present for the requested range ─────────────────
     trading_days = _trading_dates(conn, from_date, to_date, interval)
     if not trading_days:
-        p(
+        add(
             f"\n  No candle data found for {from_date} → {to_date} (interval={interval}).\n"
             "  Load candles first:\n"
             f"    python -m src.ingestor --from {from_date} --to {to_date} --lookback 90\n"
         )
-        conn.close()
+        flush()
+        if owns_conn:
+            conn.close()
         return {"trading_days": 0, "impulses": 0, "watchlist": 0}
-    p(f"\n  {len(trading_days)} trading days in candles  ·  {from_date} → {to_date}\n")
+    add(f"\n  {len(trading_days)} trading days in candles  ·  {from_date} → {to_date}\n")
+    flush()
+
+    # ── 2. Detect all impulses in the range with one scan ─────────────────────
+    # (unless the caller detected them already — the trainer shares one
+    # detection across every combo with the same threshold)
+    if impulses_by_date is None:
+        impulses_by_date = _load_impulse_candidates(conn, from_date, to_date, threshold, interval)
+
+    # ── 3. Funnel states for the whole range in one pass ──────────────────────
+    # compute_funnel_state_range loads the candle window once and walks each
+    # impulse exactly once, emitting every day's snapshots — replacing one
+    # compute_funnel_state() call (and its candle reload) per trading day.
+    all_signals = [sig for d in trading_days for sig in impulses_by_date.get(d, [])]
+    snaps_by_date = compute_funnel_state_range(
+        conn, from_date, to_date, all_signals, conditions, consolidation_days, interval
+    )
 
-    # ── 3. Day-by-day simulation ──────────────────────────────────────────────
-    # accumulated: every impulse seen so far, keyed by (ticker, impulse_date)
-    # so the same signal is never double-counted.
-    accumulated: dict[tuple[str, date], ImpulseSignal] = {}
+    # ── 4. Day-by-day report ──────────────────────────────────────────────────
+    # `accumulated` is kept only for O(1) lookups at print time; keying the
+    # outer dict by date avoids allocating and hashing a (ticker, date)
+    # tuple per probe — the inner dict hashes just the ticker string.
+    accumulated: dict[date, dict[str, ImpulseSignal]] = {}
     total_impulses  = 0
     total_watchlist = 0
 
     for i, d in enumerate(trading_days, 1):
-        # a) Detect new impulses from candles for today
-        new_signals = find_impulses(conn, d, threshold, interval)
+        # a) New impulses for today — dict lookup, already detected up front
+        new_signals = impulses_by_date.get(d, [])
         for sig in new_signals:
-            key = (sig.ticker, sig.trade_date)
-            if key not in accumulated:
-                accumulated[key] = sig
+            day_seen = accumulated.setdefault(sig.trade_date, {})
+            if sig.ticker not in day_seen:
+                day_seen[sig.ticker] = sig
                 total_impulses += 1
 
-        # b) Active impulses = within the consolidation look-back window
-        window_start    = d - dt.timedelta(days=consolidation_days + 2)
-        active_impulses = [
-            sig
-            for (ticker, imp_date), sig in accumulated.items()
-            if window_start <= imp_date <= d
-        ]
+        # b) Today's snapshots, precomputed by the range walk
+        snapshots = snaps_by_date.get(d, [])
 
-        # c) Pure funnel-state compute — reads only candles
-        snapshots = compute_funnel_state(
-            conn, d, active_impulses, conditions, consolidation_days, interval
-        )
-
-        # Bucket by state
-        day0          = [s for s in snapshots if s.state == StockState.IMPULSE]
-        consolidating = [s for s in snapshots if s.state == StockState.CONSOLIDATING]
-        watchlist     = [s for s in snapshots if s.state == StockState.WATCHLIST]
-        fallouts      = [s for s in snapshots if s.state == StockState.FALLOUT]
+        # Bucket by state — one pass instead of four comprehensions. Each
+        # snapshot is paired with its impulse signal here, once, so the print
+        # loops below never probe `accumulated` per printed row.
+        buckets: dict[StockState, list] = {s: [] for s in StockState}
+        for s in snapshots:
+            buckets[s.state].append((s, accumulated.get(s.impulse_date, {}).get(s.ticker)))
+        day0          = buckets[StockState.IMPULSE]
+        consolidating = buckets[StockState.CONSOLIDATING]
+        watchlist     = buckets[StockState.WATCHLIST]
+        fallouts      = buckets[StockState.FALLOUT]
 
         total_watchlist += len(watchlist)
 
         # ── Print day block ───────────────────────────────────────────────────
         total_active = len(day0) + len(consolidating) + len(watchlist) + len(fallouts)
-        p(_SEP)
-        p(f"  {d}  ·  Day {i}/{len(trading_days)}"
+        add(_SEP)
+        add(f"  {d}  ·  Day {i}/{len(trading_days)}"
           f"  ·  {total_active} active  ·  {len(new_signals)} new impulse(s)")
-        p(_SEP)
+        add(_SEP)
 
-        p("  ○  DAY 0 — new impulses")
+        add("  ○  DAY 0 — new impulses")
         if day0:
-            for s in sorted(day0, key=lambda x: x.ticker):
-                sig = accumulated.get((s.ticker, s.impulse_date))
+            for s, sig in sorted(day0, key=lambda x: x[0].ticker):
                 chg = f"+{sig.change_pct:.1f}%" if sig else ""
-                p(f"       {s.ticker:<22}  {chg:<8}  High {s.day0_high:.2f}")
+                add(f"       {s.ticker:<22}  {chg:<8}  High {s.day0_high:.2f}")
         else:
-            p("       (none)")
+            add("       (none)")
 
-        p("  ●  CONSOLIDATING")
+        add("  ●  CONSOLIDATING")
         if consolidating:
-            for s in sorted(consolidating, key=lambda x: (-x.stable_days, x.ticker)):
-                sig = accumulated.get((s.ticker, s.impulse_date))
+            for s, sig in sorted(consolidating, key=lambda x: (-x[0].stable_days, x[0].ticker)):
                 chg = f"+{sig.change_pct:.1f}%" if sig else ""
-                p(f"       {s.ticker:<22}  {chg:<8}  "
+                add(f"       {s.ticker:<22}  {chg:<8}  "
                   f"Day {s.stable_days}/{consolidation_days}  ·  High {s.day0_high:.2f}")
         else:
-            p("       (none)")
+            add("       (none)")
 
-        p("  ◆  WATCHLIST — ready to trade")
+        add("  ◆  WATCHLIST — ready to trade")
         if watchlist:
-            for s in sorted(watchlist, key=lambda x: x.ticker):
-                sig = accumulated.get((s.ticker, s.impulse_date))
+            for s, sig in sorted(watchlist, key=lambda x: x[0].ticker):
                 chg = f"+{sig.change_pct:.1f}%" if sig else ""
-                p(f"       {s.ticker:<22}  {chg:<8}  "
+                add(f"       {s.ticker:<22}  {chg:<8}  "
                   f"Day {s.stable_days}/{consolidation_days}  ·  High {s.day0_high:.2f}  ·  impulse {s.impulse_date}")
         else:
-            p("       (none)")
+            add("       (none)")
 
-        p("  ✕  FALLOUTS")
+        add("  ✕  FALLOUTS")
         if fallouts:
-            for s in sorted(fallouts, key=lambda x: x.ticker):
+            for s, sig in sorted(fallouts, key=lambda x: x[0].ticker):
                 short = s.failure_reason.split("] ", 1)[-1] if "]" in s.failure_reason else s.failure_reason
-                sig   = accumulated.get((s.ticker, s.impulse_date))
                 chg   = f"+{sig.change_pct:.1f}%" if sig else ""
-                p(f"       {s.ticker:<22}  {chg:<8}  {short}")
+                add(f"       {s.ticker:<22}  {chg:<8}  {short}")
         else:
-            p("       (none)")
+            add("       (none)")
 
-        p()
+        add("")
+        flush()
 
     # ── Footer ────────────────────────────────────────────────────────────────
     elapsed = time.time() - t_start
-    p(_SEP)
-    p(
+    add(_SEP)
+    add(
         f"  Done  ·  {len(trading_days)} days"
         f"  ·  {total_impulses} impulses"
         f"  ·  {total_watchlist} watchlist hits"
         f"  ·  {elapsed:.1f}s"
     )
-    p(_SEP)
-    conn.close()
+    add(_SEP)
+    flush()
+    if owns_conn:
+        conn.close()
     return {"trading_days": len(trading_days), "impulses": total_impulses, "watchlist": total_watchlist}
 
 
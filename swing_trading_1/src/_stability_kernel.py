@@ -0,0 +1,133 @@
+"""
+src/_stability_kernel.py
+========================
+Fused kernels for the stability band check and the per-impulse funnel
+walk, JIT-compiled when Numba is available.
+
+The NumPy batch path in conditions.py computes floor, ceiling and the
+fail mask as three separate ufunc passes, allocating a temporary array
+for each. With Numba the multiply/compare/or chain fuses into a single
+SIMD-friendly loop with no temporaries. Numba is strictly optional
+(install the `speed` dependency group); without it the module falls back
+to the plain NumPy implementation with identical results.
+
+The JIT'd kernel is warmed at import time with a length-1 call so the
+one-off compile (cached on disk afterwards) never lands in the middle of
+a backtest.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:                                   # pragma: no cover
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def stability_mask(
+        day0_highs: np.ndarray,
+        lows:       np.ndarray,
+        highs:      np.ndarray,
+        ceil_mul:   float,
+        floor_mul:  float,
+        out_mask:   np.ndarray,
+    ) -> None:
+        """Set out_mask[i] = True where candidate i broke the band."""
+        for i in range(day0_highs.shape[0]):
+            anchor = day0_highs[i]
+            out_mask[i] = (
+                lows[i] < anchor * floor_mul
+                or highs[i] > anchor * ceil_mul
+            )
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def funnel_walk(
+        day0_highs: np.ndarray,
+        lows:       np.ndarray,
+        highs:      np.ndarray,
+        starts:     np.ndarray,
+        ends:       np.ndarray,
+        ceil_mul:   float,
+        floor_mul:  float,
+        out_stable: np.ndarray,
+        out_fail:   np.ndarray,
+    ) -> None:
+        """
+        First-failure walk over concatenated per-impulse candle segments.
+
+        Rows for all impulses are packed into one set of parallel arrays,
+        sorted by impulse then date; impulse k owns rows
+        [starts[k], ends[k]). For each segment: out_stable[k] = number of
+        days before the first band break, out_fail[k] = absolute row index
+        of the breaking day, or -1 if the whole segment passed.
+        """
+        for k in range(starts.shape[0]):
+            stable = 0
+            fail   = -1
+            for i in range(starts[k], ends[k]):
+                anchor = day0_highs[i]
+                if lows[i] < anchor * floor_mul or highs[i] > anchor * ceil_mul:
+                    fail = i
+                    break
+                stable += 1
+            out_stable[k] = stable
+            out_fail[k]   = fail
+
+    # Warm the cache so the compile happens at import, not mid-backtest.
+    stability_mask(
+        np.zeros(1), np.zeros(1), np.zeros(1), 1.0, 1.0,
+        np.zeros(1, dtype=np.bool_),
+    )
+    funnel_walk(
+        np.zeros(1), np.zeros(1), np.zeros(1),
+        np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64),
+        1.0, 1.0,
+        np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+    )
+else:
+    def stability_mask(
+        day0_highs: np.ndarray,
+        lows:       np.ndarray,
+        highs:      np.ndarray,
+        ceil_mul:   float,
+        floor_mul:  float,
+        out_mask:   np.ndarray,
+    ) -> None:
+        """NumPy fallback — same contract as the Numba kernel."""
+        np.less(lows, day0_highs * floor_mul, out=out_mask)
+        np.logical_or(out_mask, highs > day0_highs * ceil_mul, out=out_mask)
+
+    def funnel_walk(
+        day0_highs: np.ndarray,
+        lows:       np.ndarray,
+        highs:      np.ndarray,
+        starts:     np.ndarray,
+        ends:       np.ndarray,
+        ceil_mul:   float,
+        floor_mul:  float,
+        out_stable: np.ndarray,
+        out_fail:   np.ndarray,
+    ) -> None:
+        """
+        NumPy fallback — same contract as the Numba kernel.
+
+        The fail mask for every row is computed in one vectorized pass;
+        only the first-failure scan per segment (one short argmax per
+        impulse) runs in Python.
+        """
+        fail_mask = np.empty(day0_highs.shape[0], dtype=np.bool_)
+        stability_mask(day0_highs, lows, highs, ceil_mul, floor_mul, fail_mask)
+        for k in range(starts.shape[0]):
+            seg = fail_mask[starts[k]:ends[k]]
+            if seg.any():
+                pos           = int(np.argmax(seg))
+                out_stable[k] = pos
+                out_fail[k]   = starts[k] + pos
+            else:
+                out_stable[k] = seg.shape[0]
+                out_fail[k]   = -1
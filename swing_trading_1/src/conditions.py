@@ -28,7 +28,8 @@ Built-in conditions
 Extending the system
 --------------------
 Add a new condition by:
-  1. Subclass Condition, implement name + evaluate()
+  1. Write a class with a `name` attribute and an evaluate() method
+     (Condition is a Protocol — structural typing, no subclassing needed)
   2. Append an instance to _CONDITIONS in pipeline.py
 
 No other changes needed. See FUTURE_SCOPE.md for planned additions:
@@ -46,15 +47,19 @@ depend on external state. This means:
 
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+from src._stability_kernel import stability_mask
 
 
 # ---------------------------------------------------------------------------
 # Shared data objects — no imports from src.models
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class FunnelContext:
     """
     Minimal context passed to each Condition during day-by-day evaluation.
@@ -72,7 +77,7 @@ class FunnelContext:
     stable_days: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class DayCandle:
     """Snapshot of a single ticker's OHLCV for one trading day."""
     ticker:     str
@@ -87,22 +92,28 @@ class DayCandle:
 # Base interface
 # ---------------------------------------------------------------------------
 
-class Condition(ABC):
+@runtime_checkable
+class Condition(Protocol):
     """
-    Base interface for all funnel entry/exit conditions.
-
-    Subclass this to add any new rule. The pipeline calls evaluate() on every
-    condition in _CONDITIONS for each (candidate, day) pair. First failure
-    stops evaluation and marks the candidate FALLOUT.
+    Structural interface for all funnel entry/exit conditions.
+
+    Any class with a `name` attribute and a matching evaluate() is a
+    Condition — no subclassing required. A Protocol keeps full type-checker
+    support without ABC registration/MRO machinery on a class whose method
+    sits in the funnel's hottest per-candidate loop. The pipeline calls
+    evaluate() on every condition in _CONDITIONS for each (candidate, day)
+    pair. First failure stops evaluation and marks the candidate FALLOUT.
     """
 
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """Short identifier used in failure_reason log messages."""
-        ...
+    name: str
+    """Short identifier used in failure_reason log messages."""
+
+    gates: bool
+    """True when a failure ejects the candidate (FALLOUT). Informational
+    conditions (gates=False) only produce notes, so the funnel evaluates
+    them just for candidates that reach WATCHLIST instead of every
+    candidate-day."""
 
-    @abstractmethod
     def evaluate(self, ctx: FunnelContext, candle: DayCandle) -> tuple[bool, str]:
         """
         Assess whether this candidate still belongs in the funnel.
@@ -123,7 +134,7 @@ class Condition(ABC):
 # Core condition — required for the funnel
 # ---------------------------------------------------------------------------
 
-class StabilityCondition(Condition):
+class StabilityCondition:
     """
     Days 1-4: the candle must trade within a tight range around Day 0 high.
 
@@ -140,39 +151,86 @@ class StabilityCondition(Condition):
     Configuration: STABLE_MAX_UP_PCT and STABLE_MAX_DOWN_PCT in config.py.
     """
 
-    name = "StabilityCondition"
+    name  = "StabilityCondition"
+    gates = True
 
     def __init__(self, max_up_pct: float = 1.0, max_down_pct: float = 2.0) -> None:
         self.max_up_pct   = max_up_pct
         self.max_down_pct = max_down_pct
+        # Band multipliers are fixed for the life of the condition, so the
+        # percent-to-fraction conversion is done once here rather than on
+        # every evaluate call in the funnel's inner loop.
+        self._floor_mul   = 1 - max_down_pct / 100.0
+        self._ceil_mul    = 1 + max_up_pct   / 100.0
 
     def evaluate(self, ctx: FunnelContext, candle: DayCandle) -> tuple[bool, str]:
-        anchor  = ctx.day0_high
-        floor   = anchor * (1 - self.max_down_pct / 100)
-        ceiling = anchor * (1 + self.max_up_pct   / 100)
-
-        if candle.low < floor:
-            return (
-                False,
-                f"Low {candle.low:.2f} broke floor {floor:.2f} "
-                f"(-{self.max_down_pct}% of Day0 high {anchor:.2f}) "
-                f"on Day {ctx.stable_days + 1}",
-            )
-        if candle.high > ceiling:
-            return (
-                False,
-                f"High {candle.high:.2f} broke ceiling {ceiling:.2f} "
-                f"(+{self.max_up_pct}% of Day0 high {anchor:.2f}) "
-                f"on Day {ctx.stable_days + 1}",
-            )
-        return True, ""
+        pass_mask, reasons = self.evaluate_batch(
+            np.array([ctx.day0_high],   dtype=np.float64),
+            np.array([candle.low],      dtype=np.float64),
+            np.array([candle.high],     dtype=np.float64),
+            np.array([ctx.stable_days], dtype=np.int64),
+        )
+        if pass_mask[0]:
+            return True, ""
+        return False, reasons[0]
+
+    def evaluate_batch(
+        self,
+        day0_highs:  np.ndarray,
+        lows:        np.ndarray,
+        highs:       np.ndarray,
+        stable_days: np.ndarray,
+    ) -> tuple[np.ndarray, dict[int, str]]:
+        """
+        Vectorized stability check over all active candidates at once.
+
+        Instead of one evaluate() call per (ticker, day), the funnel can hand
+        in SoA float64 vectors — one element per candidate — and get back a
+        boolean pass mask plus failure reasons keyed by array index. Reasons
+        are only formatted for the (typically few) failing rows, so the
+        common all-pass day costs a handful of ufunc calls and no f-strings.
+
+        Args:
+            day0_highs  : Day 0 high anchors, one per candidate.
+            lows        : Today's lows, aligned with day0_highs.
+            highs       : Today's highs, aligned with day0_highs.
+            stable_days : Stable-day counters, for "failed on Day N" messages.
+
+        Returns:
+            (pass_mask, reasons) — pass_mask[i] is True when candidate i stayed
+            inside the band; reasons[i] explains each failure.
+        """
+        fail_mask = np.empty(day0_highs.shape[0], dtype=np.bool_)
+        stability_mask(day0_highs, lows, highs, self._ceil_mul, self._floor_mul, fail_mask)
+
+        reasons: dict[int, str] = {}
+        if fail_mask.any():
+            # Floors/ceilings are only needed for failure messages, so they
+            # are computed per failing row rather than for the whole batch.
+            for i in np.flatnonzero(fail_mask):
+                anchor  = day0_highs[i]
+                floor   = anchor * self._floor_mul
+                ceiling = anchor * self._ceil_mul
+                if lows[i] < floor:
+                    reasons[int(i)] = (
+                        f"Low {lows[i]:.2f} broke floor {floor:.2f} "
+                        f"(-{self.max_down_pct}% of Day0 high {anchor:.2f}) "
+                        f"on Day {int(stable_days[i]) + 1}"
+                    )
+                else:
+                    reasons[int(i)] = (
+                        f"High {highs[i]:.2f} broke ceiling {ceiling:.2f} "
+                        f"(+{self.max_up_pct}% of Day0 high {anchor:.2f}) "
+                        f"on Day {int(stable_days[i]) + 1}"
+                    )
+        return np.logical_not(fail_mask), reasons
 
 
 # ---------------------------------------------------------------------------
 # Soft / informational condition
 # ---------------------------------------------------------------------------
 
-class VolumeCondition(Condition):
+class VolumeCondition:
     """
     Flags if today's volume exceeds Day 0 volume.
 
@@ -197,7 +255,10 @@ class VolumeCondition(Condition):
         Args:
             hard: If True, elevated volume causes FALLOUT. Default False (soft).
         """
-        self.hard = hard
+        self.hard  = hard
+        # A soft volume check can never eject anyone, so the funnel treats it
+        # as informational and skips it during the per-day stability walk.
+        self.gates = hard
 
     def evaluate(self, ctx: FunnelContext, candle: DayCandle) -> tuple[bool, str]:
         if ctx.day0_volume > 0 and candle.volume > ctx.day0_volume:
@@ -207,3 +268,86 @@ class VolumeCondition(Condition):
                 return False, note
             return True, f"WARN: {note}"
         return True, ""
+
+
+# ---------------------------------------------------------------------------
+# Specialized checker codegen
+# ---------------------------------------------------------------------------
+
+# Compiled checkers keyed by the conditions' specialization parameters.
+# A backtest or trainer sweep calls compile_checker once per walked date
+# with the same thresholds, so each distinct band pays the codegen + exec
+# only on first sight; a handful of grid bands keeps this dict tiny.
+_CHECKER_CACHE: dict[tuple, object] = {}
+
+
+def _specialization_key(conditions: list[Condition]) -> tuple | None:
+    """Hashable identity of the literals a checker would bake in, or None
+    when any condition is not a recognized built-in."""
+    key = []
+    for cond in conditions:
+        if isinstance(cond, StabilityCondition):
+            key.append(("stability", cond.max_up_pct, cond.max_down_pct))
+        elif isinstance(cond, VolumeCondition) and cond.hard:
+            key.append(("volume_hard",))
+        else:
+            return None
+    return tuple(key)
+
+
+def compile_checker(conditions: list[Condition]):
+    """
+    Generate one specialized gate function for a fixed condition list.
+
+    The generic walk pays a method dispatch plus FunnelContext/DayCandle
+    construction per (condition, candidate, day). The condition set and its
+    thresholds are constants for the life of a run, so for the built-in
+    gating conditions we can emit a single flat function with the band
+    multipliers baked in as literals and exec it once per distinct
+    threshold set (cached in _CHECKER_CACHE — repeat calls with the same
+    band, e.g. one per walked date in a sweep, reuse the compiled function):
+
+        note = check(high, low, volume, day0_high, day0_vol, stable_days)
+
+    `note` is the full "[ConditionName] reason" string on the first failing
+    condition, or None when every gate passed — byte-identical to what the
+    dispatch loop would produce. Returns None (no checker) if any condition
+    is not a recognized built-in, in which case the caller keeps the
+    generic evaluate() loop.
+    """
+    key = _specialization_key(conditions)
+    if key is None:
+        return None
+    cached = _CHECKER_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    body = ["def _check(h, l, v, d0h, d0v, d):"]
+    for cond in conditions:
+        if isinstance(cond, StabilityCondition):
+            body += [
+                f"    floor = d0h * {cond._floor_mul!r}",
+                f"    if l < floor:",
+                f"        return (f'[{cond.name}] Low {{l:.2f}} broke floor {{floor:.2f}} '",
+                f"                f'(-{cond.max_down_pct}% of Day0 high {{d0h:.2f}}) '",
+                f"                f'on Day {{d + 1}}')",
+                f"    ceiling = d0h * {cond._ceil_mul!r}",
+                f"    if h > ceiling:",
+                f"        return (f'[{cond.name}] High {{h:.2f}} broke ceiling {{ceiling:.2f}} '",
+                f"                f'(+{cond.max_up_pct}% of Day0 high {{d0h:.2f}}) '",
+                f"                f'on Day {{d + 1}}')",
+            ]
+        elif isinstance(cond, VolumeCondition) and cond.hard:
+            body += [
+                f"    if d0v > 0 and v > d0v:",
+                f"        return (f'[{cond.name}] Volume {{v / d0v:.1f}}x Day0 '",
+                f"                f'(elevated — watch for continuation)')",
+            ]
+        else:
+            return None
+    body.append("    return None")
+
+    ns: dict = {}
+    exec(compile("\n".join(body), "<compile_checker>", "exec"), ns)
+    _CHECKER_CACHE[key] = ns["_check"]
+    return ns["_check"]
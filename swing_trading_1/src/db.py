@@ -1,8 +1,15 @@
 import duckdb
+import pyarrow as pa
 from datetime import date
 from pathlib import Path
 from src.models import CandleRecord, ImpulseSignal, RunLog, FunnelSnapshot
 
+# A convention shared by every DuckDB module in this project: per-call SQL
+# lives in module-level constants. The Python API exposes no conn.prepare(),
+# so submitting one canonical, byte-identical string per statement — with
+# only the bound parameters changing — is the closest equivalent, avoiding
+# per-call string builds and keeping repeated executions friendly to
+# DuckDB's statement caches. Other modules reference this note.
 _DDL_CANDLES = """
 CREATE TABLE IF NOT EXISTS candles (
     ticker       VARCHAR,
@@ -14,9 +21,17 @@ CREATE TABLE IF NOT EXISTS candles (
     close        DOUBLE,
     volume       DOUBLE,
     ingested_at  TIMESTAMP,
+    trade_date   DATE,
     PRIMARY KEY (ticker, datetime, interval)
 )
 """
+# trade_date is datetime materialized to a DATE at ingest time. Every hot
+# query filters by day; filtering on a plain DATE column lets DuckDB use
+# min/max zonemap pruning, which CAST(datetime AS DATE) = ? defeats.
+
+_DDL_CANDLES_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_candles_int_dt ON candles(interval, trade_date)
+"""
 
 _DDL_IMPULSES = """
 CREATE TABLE IF NOT EXISTS impulse_signals (
@@ -62,6 +77,31 @@ CREATE TABLE IF NOT EXISTS funnel_snapshots (
 # Re-running a date never mutates existing rows. Full history is preserved.
 # Re-running any date range in any order always produces the same table state.
 
+_DDL_DAILY_FUNNEL = """
+CREATE OR REPLACE VIEW daily_funnel AS
+SELECT
+    fs.ticker,
+    fs.snapshot_date,
+    fs.impulse_date,
+    fs.state,
+    fs.stable_days,
+    fs.day0_high,
+    fs.day0_volume,
+    fs.failure_reason,
+    i.direction,
+    i.change_pct,
+    i.open  AS impulse_open,
+    i.close AS impulse_close
+FROM funnel_snapshots fs
+LEFT JOIN impulse_signals i
+    ON fs.ticker = i.ticker AND fs.impulse_date = i.trade_date
+"""
+# Every funnel consumer (dashboard tabs, ad-hoc queries) wants snapshots
+# joined to their originating impulse. Defining the join once as a view
+# keeps the UI queries to simple single-relation filters while DuckDB still
+# pushes the snapshot_date predicate and column projection through the view
+# into the base-table scans — no second copy of the data on disk.
+
 
 def get_conn(db_path: str) -> duckdb.DuckDBPyConnection:
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -70,33 +110,98 @@ def get_conn(db_path: str) -> duckdb.DuckDBPyConnection:
     conn.execute(_DDL_IMPULSES)
     conn.execute(_DDL_RUN_LOG)
     conn.execute(_DDL_FUNNEL_SNAPSHOTS)
+    # Migrate DBs created before trade_date existed, then backfill any rows
+    # that predate the column (no-op on a fresh or up-to-date file).
+    conn.execute("ALTER TABLE candles ADD COLUMN IF NOT EXISTS trade_date DATE")
+    conn.execute("UPDATE candles SET trade_date = CAST(datetime AS DATE) WHERE trade_date IS NULL")
+    conn.execute(_DDL_CANDLES_INDEX)
+    conn.execute(_DDL_DAILY_FUNNEL)
     return conn
 
 
+def ensure_migrated(db_path: str) -> None:
+    """
+    Bring an existing database file up to the current schema before a
+    read-only consumer opens it.
+
+    Files written before the trade_date column and the daily_funnel view
+    existed are still valid, but the backtester and trainer query both
+    and open the DB read-only, so they can never apply the migrations
+    themselves. A cheap read-only probe checks whether anything is
+    missing; only then is the file opened writable once, letting
+    get_conn() run its idempotent migration block.
+    """
+    conn = duckdb.connect(db_path, read_only=True)
+    try:
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(candles)").fetchall()}
+        views = conn.execute(
+            "SELECT COUNT(*) FROM duckdb_views() WHERE view_name = 'daily_funnel'"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    if "trade_date" in cols and views:
+        return
+    get_conn(db_path).close()
+
+
+def _staged_insert(conn: duckdb.DuckDBPyConnection, tbl: pa.Table, sql: str) -> int:
+    """
+    Bulk-insert an Arrow table by registering it as a staging view.
+
+    executemany binds every row's parameters one at a time; registering a
+    columnar batch and INSERT ... SELECT-ing from it moves the whole block
+    in one vectorized copy instead.
+    """
+    conn.register("_stg", tbl)
+    try:
+        conn.execute(sql)
+    finally:
+        conn.unregister("_stg")
+    return tbl.num_rows
+
+
 def upsert_candles(conn: duckdb.DuckDBPyConnection, records: list[CandleRecord]) -> int:
     if not records:
         return 0
-    rows = [(r.ticker, r.datetime, r.interval, r.open, r.high,
-             r.low, r.close, r.volume, r.ingested_at) for r in records]
-    conn.executemany("""
+    tbl = pa.table({
+        "ticker":      [r.ticker      for r in records],
+        "datetime":    [r.datetime    for r in records],
+        "interval":    [r.interval    for r in records],
+        "open":        [r.open        for r in records],
+        "high":        [r.high        for r in records],
+        "low":         [r.low         for r in records],
+        "close":       [r.close       for r in records],
+        "volume":      [r.volume      for r in records],
+        "ingested_at": [r.ingested_at for r in records],
+        "trade_date":  [r.datetime.date() for r in records],
+    })
+    return _staged_insert(conn, tbl, """
         INSERT OR REPLACE INTO candles
-            (ticker, datetime, interval, open, high, low, close, volume, ingested_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    return len(rows)
+            (ticker, datetime, interval, open, high, low, close, volume, ingested_at, trade_date)
+        SELECT ticker, datetime, interval, open, high, low, close, volume, ingested_at, trade_date
+        FROM _stg
+    """)
 
 
 def upsert_impulses(conn: duckdb.DuckDBPyConnection, signals: list[ImpulseSignal]) -> int:
     if not signals:
         return 0
-    rows = [(s.ticker, s.trade_date, s.open, s.close, s.change_pct,
-             s.direction, s.interval, s.detected_at) for s in signals]
-    conn.executemany("""
+    tbl = pa.table({
+        "ticker":      [s.ticker      for s in signals],
+        "trade_date":  [s.trade_date  for s in signals],
+        "open":        [s.open        for s in signals],
+        "close":       [s.close       for s in signals],
+        "change_pct":  [s.change_pct  for s in signals],
+        "direction":   [s.direction   for s in signals],
+        "interval":    [s.interval    for s in signals],
+        "detected_at": [s.detected_at for s in signals],
+    })
+    return _staged_insert(conn, tbl, """
         INSERT OR REPLACE INTO impulse_signals
             (ticker, trade_date, open, close, change_pct, direction, interval, detected_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    return len(rows)
+        SELECT ticker, trade_date, open, close, change_pct, direction, interval, detected_at
+        FROM _stg
+    """)
 
 
 def log_run(conn: duckdb.DuckDBPyConnection, run: RunLog) -> None:
@@ -109,20 +214,23 @@ def log_run(conn: duckdb.DuckDBPyConnection, run: RunLog) -> None:
 
 
 def get_missing_dates(conn: duckdb.DuckDBPyConnection, since: date, until: date) -> list[date]:
-    """Return weekdays in [since, until] that have no successful run_log entry."""
-    result = conn.execute("""
-        SELECT DISTINCT run_date FROM run_log WHERE status = 'success'
-    """).fetchall()
-    completed = {r[0] for r in result}
-
-    from datetime import timedelta
-    missing = []
-    d = since
-    while d <= until:
-        if d.weekday() < 5 and d not in completed:  # Mon–Fri only
-            missing.append(d)
-        d += timedelta(days=1)
-    return missing
+    """
+    Return weekdays in [since, until] that have no successful run_log entry.
+
+    The whole range is generated and anti-joined inside DuckDB — one
+    vectorized query instead of a Python day-by-day loop, which matters for
+    multi-year backfills. DuckDB's dow: 0=Sunday … 6=Saturday.
+    """
+    rows = conn.execute("""
+        SELECT CAST(d AS DATE)
+        FROM   generate_series(CAST(? AS DATE), CAST(? AS DATE), INTERVAL 1 DAY) t(d)
+        WHERE  EXTRACT(dow FROM d) BETWEEN 1 AND 5
+          AND  CAST(d AS DATE) NOT IN (
+                   SELECT run_date FROM run_log WHERE status = 'success'
+               )
+        ORDER  BY 1
+    """, [since, until]).fetchall()
+    return [r[0] for r in rows]
 
 
 def query(conn: duckdb.DuckDBPyConnection, sql: str):
@@ -152,15 +260,21 @@ def write_funnel_snapshots(conn: duckdb.DuckDBPyConnection, snapshots: list[Funn
     """
     if not snapshots:
         return 0
-    rows = [
-        (s.ticker, s.snapshot_date, s.impulse_date, s.state.value,
-         s.stable_days, s.day0_high, s.day0_volume, s.failure_reason)
-        for s in snapshots
-    ]
-    conn.executemany("""
+    tbl = pa.table({
+        "ticker":         [s.ticker         for s in snapshots],
+        "snapshot_date":  [s.snapshot_date  for s in snapshots],
+        "impulse_date":   [s.impulse_date   for s in snapshots],
+        "state":          [s.state.value    for s in snapshots],
+        "stable_days":    [s.stable_days    for s in snapshots],
+        "day0_high":      [s.day0_high      for s in snapshots],
+        "day0_volume":    [s.day0_volume    for s in snapshots],
+        "failure_reason": [s.failure_reason for s in snapshots],
+    })
+    return _staged_insert(conn, tbl, """
         INSERT OR IGNORE INTO funnel_snapshots
             (ticker, snapshot_date, impulse_date, state,
              stable_days, day0_high, day0_volume, failure_reason)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    return len(rows)
+        SELECT ticker, snapshot_date, impulse_date, state,
+               stable_days, day0_high, day0_volume, failure_reason
+        FROM _stg
+    """)
@@ -54,19 +54,44 @@ Standalone tracker display
 from __future__ import annotations
 
 import sys
-from datetime import date
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
 from pathlib import Path
 
 import duckdb
+import numpy as np
+import polars as pl
+import pyarrow as pa
 
-from src.conditions import Condition, DayCandle, FunnelContext, StabilityCondition, VolumeCondition
-from src.models import FunnelSnapshot, ImpulseSignal, StockState
+from src._stability_kernel import funnel_walk
+from src.conditions import (
+    Condition, DayCandle, FunnelContext, StabilityCondition, VolumeCondition,
+    compile_checker,
+)
+from src.models import FunnelSnapshot, FunnelSnapshotRow, ImpulseSignal, StockState
 
 
 # ---------------------------------------------------------------------------
 # Day candle loader
 # ---------------------------------------------------------------------------
 
+# Hoisted like the window query below — see the SQL-constants note in
+# src/db.py.
+_DAY_CANDLES_SQL = """
+    SELECT
+        ticker,
+        high,
+        low,
+        close,
+        volume,
+        CASE WHEN open > 0 THEN (close - open) / open * 100 ELSE 0 END AS change_pct
+    FROM candles
+    WHERE trade_date = ?
+      AND interval = ?
+      AND open > 0
+"""
+
+
 def fetch_day_candles(
     conn:       duckdb.DuckDBPyConnection,
     trade_date: date,
@@ -75,30 +100,279 @@ def fetch_day_candles(
     """
     Read one day's OHLCV from the candles table.
     Returns { ticker: DayCandle } for O(1) lookups during condition evaluation.
+
+    The result crosses the DuckDB boundary as an Arrow table — contiguous
+    C buffers per column — instead of fetchall()'s per-row Python tuples,
+    so the only per-row work left is constructing the DayCandle itself.
     """
-    rows = conn.execute("""
-        SELECT
-            ticker,
-            high,
-            low,
-            close,
-            volume,
-            CASE WHEN open > 0 THEN (close - open) / open * 100 ELSE 0 END
-        FROM candles
-        WHERE CAST(datetime AS DATE) = ?
-          AND interval = ?
-          AND open > 0
-    """, [trade_date, interval]).fetchall()
+    tbl = conn.execute(_DAY_CANDLES_SQL, [trade_date, interval]).fetch_arrow_table()
+
+    tickers = tbl.column("ticker").to_pylist()
+    highs   = tbl.column("high").to_numpy()
+    lows    = tbl.column("low").to_numpy()
+    closes  = tbl.column("close").to_numpy()
+    volumes = tbl.column("volume").to_numpy()
+    chgs    = tbl.column("change_pct").to_numpy()
 
     return {
-        row[0]: DayCandle(
-            ticker=row[0], high=row[1], low=row[2],
-            close=row[3], volume=row[4], change_pct=row[5],
+        tickers[i]: DayCandle(
+            ticker=tickers[i], high=highs[i], low=lows[i],
+            close=closes[i], volume=volumes[i], change_pct=chgs[i],
         )
-        for row in rows
+        for i in range(len(tickers))
     }
 
 
+_WINDOW_CANDLES_SQL = """
+    SELECT
+        ticker,
+        trade_date,
+        high,
+        low,
+        close,
+        volume,
+        CASE WHEN open > 0 THEN (close - open) / open * 100 ELSE 0 END
+    FROM candles
+    WHERE trade_date BETWEEN ? AND ?
+      AND interval = ?
+      AND open > 0
+"""
+
+
+def _fetch_window_candles(
+    conn:      duckdb.DuckDBPyConnection,
+    from_date: date,
+    to_date:   date,
+    interval:  str,
+) -> dict[date, dict[str, DayCandle]]:
+    """
+    Read every candle in [from_date, to_date] with ONE range scan.
+
+    compute_funnel_state used to call fetch_day_candles() per impulse per
+    day — O(impulses × window) round-trips, each materializing a full-day
+    dict. DuckDB chews through one range scan far faster, so the whole
+    window is loaded up front and bucketed as {date: {ticker: DayCandle}}
+    for the same O(1) lookups the walk already does.
+    """
+    rows = conn.execute(_WINDOW_CANDLES_SQL, [from_date, to_date, interval]).fetchall()
+
+    by_date: dict[date, dict[str, DayCandle]] = {}
+    for ticker, d, high, low, close, volume, change_pct in rows:
+        by_date.setdefault(d, {})[ticker] = DayCandle(
+            ticker=ticker, high=high, low=low,
+            close=close, volume=volume, change_pct=change_pct,
+        )
+    return by_date
+
+
+# ---------------------------------------------------------------------------
+# Vectorized fast path
+# ---------------------------------------------------------------------------
+
+# Joins the registered _imp staging view (one row per active impulse) to
+# candles over each impulse's own window [impulse_date, snapshot_date].
+# Anchor rows and walk rows come back together from one vectorized scan.
+_IMPULSE_WINDOW_SQL = """
+    SELECT
+        i.ticker,
+        i.impulse_date,
+        c.trade_date              AS d,
+        c.high,
+        c.low,
+        c.close,
+        c.volume,
+        (c.close - c.open) / c.open * 100  AS change_pct
+    FROM _imp i
+    JOIN candles c
+      ON c.ticker   = i.ticker
+     AND c.interval = ?
+     AND c.trade_date BETWEEN i.impulse_date AND ?
+    WHERE c.open > 0
+"""
+
+
+def _compute_funnel_state_vectorized(
+    conn:               duckdb.DuckDBPyConnection,
+    snapshot_date:      date,
+    impulses:           list[ImpulseSignal],
+    stability:          StabilityCondition,
+    info:               list[Condition],
+    consolidation_days: int,
+    interval:           str,
+) -> list[FunnelSnapshotRow]:
+    """
+    Vectorized funnel walk for the default condition set.
+
+    The scalar walk evaluates one (impulse, day) pair per Python iteration.
+    Here every pair becomes a row in one frame: candles join the impulse
+    list on ticker, the rows are packed into contiguous per-impulse
+    segments, and the branchy first-failure walk runs in the funnel_walk
+    kernel (Numba-JIT'd when available, NumPy otherwise) over raw float64
+    arrays. Only the handful of failing rows are ever formatted into
+    failure strings. Results are identical to the scalar walk.
+    """
+    snapshots: list[FunnelSnapshotRow] = []
+
+    # One DuckDB join delivers every row the funnel needs: the unique
+    # (ticker, impulse_date) pairs are registered as a staging view and
+    # joined to candles over each pair's own window, so the anchor row
+    # (d == impulse_date) and the walk rows (d > impulse_date) arrive from
+    # a single vectorized scan — no separate anchor fetch, no Python-side
+    # ticker join.
+    all_pairs = sorted({(s.ticker, s.trade_date) for s in impulses})
+    conn.register("_imp", pa.table({
+        "ticker":       [t for t, _ in all_pairs],
+        "impulse_date": [d for _, d in all_pairs],
+    }))
+    try:
+        frame: pl.DataFrame = conn.execute(
+            _IMPULSE_WINDOW_SQL, [interval, snapshot_date]
+        ).pl()
+    finally:
+        conn.unregister("_imp")
+
+    # Day 0 anchors — (ticker, impulse_date) → (high, volume)
+    anchors: dict[tuple[str, date], tuple[float, float]] = {}
+    adf = frame.filter(pl.col("d") == pl.col("impulse_date"))
+    for t, d, h, v in zip(adf["ticker"].to_list(), adf["impulse_date"].to_list(),
+                          adf["high"].to_list(), adf["volume"].to_list()):
+        anchors[(t, d)] = (h, v)
+
+    def _anchor(sig: ImpulseSignal) -> tuple[float, float]:
+        return anchors.get((sig.ticker, sig.trade_date), (sig.close, 0.0))
+
+    sig_close  = {(s.ticker, s.trade_date): s.close for s in impulses}
+    walk_pairs = [p for p in all_pairs if p[1] < snapshot_date]
+    walked: dict[tuple[str, date], tuple] = {}
+    if walk_pairs and frame.height:
+        # Attach each pair's Day 0 anchor (resolved once per impulse, with
+        # the usual close-price fallback), then pack every impulse's window
+        # rows into contiguous parallel arrays (sorted by impulse, then
+        # date) and hand the branchy first-failure walk to the JIT'd kernel
+        # — one fused loop over raw float64 data.
+        idf = pl.DataFrame({
+            "ticker":       [t for t, _ in walk_pairs],
+            "impulse_date": [d for _, d in walk_pairs],
+            "day0_high":    [anchors.get(p, (sig_close[p], 0.0))[0] for p in walk_pairs],
+        })
+        walk = (
+            frame.filter(pl.col("d") > pl.col("impulse_date"))
+                 .join(idf, on=["ticker", "impulse_date"], how="inner")
+                 .sort(["ticker", "impulse_date", "d"])
+        )
+        if walk.height:
+            # Structure-of-arrays layout: one contiguous float64 column per
+            # field, packed as 1-D per-impulse segments rather than a padded
+            # (ticker × date) matrix — same cache-friendly sequential access
+            # without NaN fill for tickers that gap. The kernel below only
+            # ever touches these flat buffers.
+            d0s   = np.ascontiguousarray(walk["day0_high"].to_numpy(), dtype=np.float64)
+            lows  = np.ascontiguousarray(walk["low"].to_numpy(),       dtype=np.float64)
+            highs = np.ascontiguousarray(walk["high"].to_numpy(),      dtype=np.float64)
+
+            # Segment boundaries: one segment per (ticker, impulse_date)
+            seg_id = walk.select(
+                pl.struct(["ticker", "impulse_date"]).rle_id()
+            ).to_series().to_numpy()
+            breaks = np.flatnonzero(np.diff(seg_id)) + 1
+            starts = np.concatenate(([0], breaks)).astype(np.int64)
+            ends   = np.concatenate((breaks, [walk.height])).astype(np.int64)
+
+            out_stable = np.empty(starts.shape[0], dtype=np.int64)
+            out_fail   = np.empty(starts.shape[0], dtype=np.int64)
+            funnel_walk(d0s, lows, highs, starts, ends,
+                        stability._ceil_mul, stability._floor_mul,
+                        out_stable, out_fail)
+
+            tickers_col = walk["ticker"].to_list()
+            imp_col     = walk["impulse_date"].to_list()
+            closes      = walk["close"].to_numpy()
+            vols        = walk["volume"].to_numpy()
+            chgs        = walk["change_pct"].to_numpy()
+
+            def _row_vals(i: int) -> tuple:
+                return (float(highs[i]), float(lows[i]), float(closes[i]),
+                        float(vols[i]), float(chgs[i]))
+
+            for k in range(starts.shape[0]):
+                s, e     = int(starts[k]), int(ends[k])
+                fail_idx = int(out_fail[k])
+                walked[(tickers_col[s], imp_col[s])] = (
+                    e - s,
+                    fail_idx >= 0,
+                    int(out_stable[k]),
+                    _row_vals(fail_idx) if fail_idx >= 0 else None,
+                    _row_vals(e - 1),
+                )
+
+    for sig in impulses:
+        day0_high, day0_vol = _anchor(sig)
+
+        if sig.trade_date == snapshot_date:
+            snapshots.append(FunnelSnapshotRow(
+                ticker        = sig.ticker,
+                snapshot_date = snapshot_date,
+                impulse_date  = sig.trade_date,
+                state         = StockState.IMPULSE,
+                stable_days   = 0,
+                day0_high     = day0_high,
+                day0_volume   = day0_vol,
+            ))
+            continue
+
+        hit          = walked.get((sig.ticker, sig.trade_date))
+        failure_note = ""
+        if hit is None:
+            # No candle data after the impulse (gap) — same as a zero-day walk
+            stable_days, fallout = 0, False
+            last_vals = None
+        else:
+            n, fail_any, fail_pos, f_vals, last_vals = hit
+            fallout     = bool(fail_any)
+            stable_days = int(fail_pos) if fallout else int(n)
+            if fallout:
+                # Format the reason with the condition itself so the message
+                # matches the scalar walk byte for byte.
+                ctx    = FunnelContext(day0_high, day0_vol, stable_days)
+                candle = DayCandle(sig.ticker, f_vals[0], f_vals[1],
+                                   f_vals[2], f_vals[3], f_vals[4])
+                _, note      = stability.evaluate(ctx, candle)
+                failure_note = f"[{stability.name}] {note}"
+
+        if fallout:
+            state = StockState.FALLOUT
+        elif stable_days >= consolidation_days:
+            state = StockState.WATCHLIST
+        elif stable_days > 0:
+            state = StockState.CONSOLIDATING
+        else:
+            state = StockState.IMPULSE
+
+        if state == StockState.WATCHLIST and info and last_vals is not None:
+            ctx    = FunnelContext(day0_high, day0_vol, stable_days)
+            candle = DayCandle(sig.ticker, last_vals[0], last_vals[1],
+                               last_vals[2], last_vals[3], last_vals[4])
+            notes = []
+            for cond in info:
+                _, note = cond.evaluate(ctx, candle)
+                if note:
+                    notes.append(f"[{cond.name}] {note}")
+            failure_note = "; ".join(notes)
+
+        snapshots.append(FunnelSnapshotRow(
+            ticker        = sig.ticker,
+            snapshot_date = snapshot_date,
+            impulse_date  = sig.trade_date,
+            state         = state,
+            stable_days   = stable_days,
+            day0_high     = day0_high,
+            day0_volume   = day0_vol,
+            failure_reason= failure_note,
+        ))
+
+    return snapshots
+
+
 # ---------------------------------------------------------------------------
 # Core compute function
 # ---------------------------------------------------------------------------
@@ -110,7 +384,7 @@ def compute_funnel_state(
     conditions:         list[Condition],
     consolidation_days: int = 4,
     interval:           str = "1d",
-) -> list[FunnelSnapshot]:
+) -> list[FunnelSnapshotRow]:
     """
     Compute the funnel state for all active impulses as of snapshot_date.
 
@@ -125,7 +399,8 @@ def compute_funnel_state(
           - stable_days >= consolidation_days → WATCHLIST
           - Otherwise      → CONSOLIDATING
 
-    Candle data for both Day 0 (anchor) and Days 1-4 is loaded from DuckDB.
+    Candle data for both Day 0 (anchor) and Days 1-4 is loaded from DuckDB
+    in a single range query up front — see _fetch_window_candles().
     No external state is read or written. This is a pure function.
 
     Args:
@@ -140,17 +415,54 @@ def compute_funnel_state(
     Returns:
         List of FunnelSnapshot objects — one per impulse, ready for INSERT OR IGNORE.
     """
-    snapshots: list[FunnelSnapshot] = []
+    if not impulses:
+        return []
+
+    # Split conditions once: gating conditions decide state day by day;
+    # informational ones (e.g. soft VolumeCondition) only produce notes, so
+    # they are evaluated a single time — and only for candidates that make
+    # it to WATCHLIST — instead of on every candidate-day.
+    gating = [c for c in conditions if getattr(c, "gates", True)]
+    info   = [c for c in conditions if not getattr(c, "gates", True)]
+
+    # Fast path: the default configuration gates on StabilityCondition alone,
+    # whose band check is pure arithmetic. That walk vectorizes cleanly, so
+    # all (impulse × day) checks run as Polars column ops instead of a Python
+    # loop. Custom gating conditions fall back to the scalar walk below.
+    if len(gating) == 1 and isinstance(gating[0], StabilityCondition):
+        return _compute_funnel_state_vectorized(
+            conn, snapshot_date, impulses, gating[0], info,
+            consolidation_days, interval,
+        )
+
+    snapshots: list[FunnelSnapshotRow] = []
+
+    # One bulk query covers every candle the walk can touch — from the
+    # earliest Day 0 anchor through snapshot_date — replacing the per-day
+    # fetch_day_candles() round-trips inside the impulse loop.
+    earliest = min(sig.trade_date for sig in impulses)
+    by_date  = _fetch_window_candles(conn, earliest, snapshot_date, interval)
+    _EMPTY: dict[str, DayCandle] = {}
+
+    # Sessions with any data at all, in order. Walking these instead of
+    # stepping calendar days skips weekends and exchange holidays outright
+    # rather than probing each one and finding no candle.
+    trading_days = sorted(d for d in by_date if d <= snapshot_date)
+
+    # When every gating condition is a recognized built-in, exec one flat
+    # checker with the thresholds baked in as literals — no per-day method
+    # dispatch or context objects. Custom conditions keep the generic loop.
+    checker = compile_checker(gating)
 
     for sig in impulses:
-        # --- Day 0 anchor: read the impulse day's full candle ---
-        day0_candle = fetch_day_candles(conn, sig.trade_date, interval).get(sig.ticker)
+        # --- Day 0 anchor: the impulse day's full candle, from the preload ---
+        day0_candle = by_date.get(sig.trade_date, _EMPTY).get(sig.ticker)
         day0_high   = day0_candle.high   if day0_candle else sig.close
         day0_vol    = day0_candle.volume if day0_candle else 0.0
 
         # --- Day 0 itself: just record as IMPULSE, no stability check ---
         if sig.trade_date == snapshot_date:
-            snapshots.append(FunnelSnapshot(
+            snapshots.append(FunnelSnapshotRow(
                 ticker        = sig.ticker,
                 snapshot_date = snapshot_date,
                 impulse_date  = sig.trade_date,
@@ -162,39 +474,46 @@ def compute_funnel_state(
             continue
 
         # --- Days 1-N: walk candles from impulse_date+1 to snapshot_date ---
-        import datetime as dt
         stable_days   = 0
         fallout       = False
         failure_note  = ""
+        last_candle   = None
+
+        # One context per impulse, mutated day by day — the Day 0 anchors
+        # never change mid-walk, so re-allocating it per day only fed the
+        # allocator. Only needed when the generic dispatch loop runs.
+        ctx = None if checker is not None else FunnelContext(
+            day0_high   = day0_high,
+            day0_volume = day0_vol,
+        )
 
-        check_date = sig.trade_date + dt.timedelta(days=1)
-        while check_date <= snapshot_date:
-            day_candles = fetch_day_candles(conn, check_date, interval)
-            candle      = day_candles.get(sig.ticker)
+        for check_date in trading_days[bisect_right(trading_days, sig.trade_date):]:
+            candle = by_date[check_date].get(sig.ticker)
 
             if candle is None:
-                # No data for this day (holiday / data gap) — skip, don't penalise
-                check_date += dt.timedelta(days=1)
+                # No data for this ticker today (data gap) — skip, don't penalise
                 continue
 
-            ctx = FunnelContext(
-                day0_high   = day0_high,
-                day0_volume = day0_vol,
-                stable_days = stable_days,
-            )
-
-            for cond in conditions:
-                ok, note = cond.evaluate(ctx, candle)
-                if not ok:
+            last_candle = candle
+            if checker is not None:
+                note = checker(candle.high, candle.low, candle.volume,
+                               day0_high, day0_vol, stable_days)
+                if note is not None:
                     fallout      = True
-                    failure_note = f"[{cond.name}] {note}"
+                    failure_note = note
+                    break
+            else:
+                ctx.stable_days = stable_days
+                for cond in gating:
+                    ok, note = cond.evaluate(ctx, candle)
+                    if not ok:
+                        fallout      = True
+                        failure_note = f"[{cond.name}] {note}"
+                        break
+                if fallout:
                     break
-
-            if fallout:
-                break
 
             stable_days += 1
-            check_date  += dt.timedelta(days=1)
 
         # --- Determine final state ---
         if fallout:
@@ -206,7 +525,19 @@ def compute_funnel_state(
         else:
             state = StockState.IMPULSE
 
-        snapshots.append(FunnelSnapshot(
+        # Informational conditions run once, on the latest candle, and only
+        # for WATCHLIST rows — their notes surface alongside the snapshot.
+        if state == StockState.WATCHLIST and info and last_candle is not None:
+            ctx   = FunnelContext(day0_high=day0_high, day0_volume=day0_vol,
+                                  stable_days=stable_days)
+            notes = []
+            for cond in info:
+                _, note = cond.evaluate(ctx, last_candle)
+                if note:
+                    notes.append(f"[{cond.name}] {note}")
+            failure_note = "; ".join(notes)
+
+        snapshots.append(FunnelSnapshotRow(
             ticker        = sig.ticker,
             snapshot_date = snapshot_date,
             impulse_date  = sig.trade_date,
@@ -221,27 +552,157 @@ def compute_funnel_state(
 
 
 # ---------------------------------------------------------------------------
-# Tracker display
+# Multi-date batch mode
 # ---------------------------------------------------------------------------
 
-def print_tracker(
+def compute_funnel_state_range(
     conn:               duckdb.DuckDBPyConnection,
+    start:              date,
+    end:                date,
+    impulses:           list[ImpulseSignal],
+    conditions:         list[Condition],
     consolidation_days: int = 4,
-    as_of:              date | None = None,
-) -> None:
-    """Print the current funnel state from funnel_snapshots in four sections."""
-    target = as_of or date.today()
-    W      = 56
-    SEP    = "━" * W
+    interval:           str = "1d",
+) -> dict[date, list[FunnelSnapshotRow]]:
+    """
+    Compute funnel snapshots for EVERY trading date in [start, end] at once.
 
-    # Join with impulse_signals to get change_pct for display
-    rows = conn.execute("""
+    Backfills and backtests that call compute_funnel_state() per date
+    re-fetch the same candle window and re-walk the same days once per
+    snapshot date — for a 90-day range each Day 0 anchor is loaded ~90
+    times. Here the union of all candles is loaded once and each impulse
+    is walked exactly once, emitting a snapshot row per session as the
+    walk passes it. Each impulse emits through
+    impulse_date + consolidation_days + 2 calendar days — the same active
+    window the backtest engine applies — capped at `end`.
+
+    Results are identical, row for row, to calling compute_funnel_state()
+    for each date with the impulses active on that date.
+
+    Returns:
+        {snapshot_date: [FunnelSnapshotRow, ...]} covering every emitted date.
+    """
+    if not impulses:
+        return {}
+
+    gating  = [c for c in conditions if getattr(c, "gates", True)]
+    info    = [c for c in conditions if not getattr(c, "gates", True)]
+    checker = compile_checker(gating)
+
+    earliest     = min(sig.trade_date for sig in impulses)
+    by_date      = _fetch_window_candles(conn, earliest, end, interval)
+    _EMPTY: dict[str, DayCandle] = {}
+    trading_days = sorted(d for d in by_date if d <= end)
+
+    horizon = timedelta(days=consolidation_days + 2)
+    out: dict[date, list[FunnelSnapshotRow]] = {}
+
+    for sig in impulses:
+        day0_candle = by_date.get(sig.trade_date, _EMPTY).get(sig.ticker)
+        day0_high   = day0_candle.high   if day0_candle else sig.close
+        day0_vol    = day0_candle.volume if day0_candle else 0.0
+        last_day    = min(end, sig.trade_date + horizon)
+
+        stable_days  = 0
+        fallout      = False
+        failure_note = ""
+        last_candle  = None
+        ctx = None if checker is not None else FunnelContext(
+            day0_high   = day0_high,
+            day0_volume = day0_vol,
+        )
+
+        lo = bisect_left(trading_days, sig.trade_date)
+        hi = bisect_right(trading_days, last_day)
+        for snap in trading_days[lo:hi]:
+            if snap == sig.trade_date:
+                if snap >= start:
+                    out.setdefault(snap, []).append(FunnelSnapshotRow(
+                        ticker        = sig.ticker,
+                        snapshot_date = snap,
+                        impulse_date  = sig.trade_date,
+                        state         = StockState.IMPULSE,
+                        stable_days   = 0,
+                        day0_high     = day0_high,
+                        day0_volume   = day0_vol,
+                    ))
+                continue
+
+            candle = by_date[snap].get(sig.ticker)
+            if candle is not None and not fallout:
+                last_candle = candle
+                if checker is not None:
+                    note = checker(candle.high, candle.low, candle.volume,
+                                   day0_high, day0_vol, stable_days)
+                    if note is not None:
+                        fallout      = True
+                        failure_note = note
+                else:
+                    ctx.stable_days = stable_days
+                    for cond in gating:
+                        ok, note = cond.evaluate(ctx, candle)
+                        if not ok:
+                            fallout      = True
+                            failure_note = f"[{cond.name}] {note}"
+                            break
+                if not fallout:
+                    stable_days += 1
+
+            if snap < start:
+                continue
+
+            if fallout:
+                state = StockState.FALLOUT
+            elif stable_days >= consolidation_days:
+                state = StockState.WATCHLIST
+            elif stable_days > 0:
+                state = StockState.CONSOLIDATING
+            else:
+                state = StockState.IMPULSE
+
+            note_out = failure_note
+            if state == StockState.WATCHLIST and info and last_candle is not None:
+                ictx  = FunnelContext(day0_high=day0_high, day0_volume=day0_vol,
+                                      stable_days=stable_days)
+                notes = []
+                for cond in info:
+                    _, note = cond.evaluate(ictx, last_candle)
+                    if note:
+                        notes.append(f"[{cond.name}] {note}")
+                note_out = "; ".join(notes)
+
+            out.setdefault(snap, []).append(FunnelSnapshotRow(
+                ticker        = sig.ticker,
+                snapshot_date = snap,
+                impulse_date  = sig.trade_date,
+                state         = state,
+                stable_days   = stable_days,
+                day0_high     = day0_high,
+                day0_volume   = day0_vol,
+                failure_reason= note_out,
+            ))
+
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Tracker display
+# ---------------------------------------------------------------------------
+
+
+# Both tracker sections — today's snapshot and the recent-fallout history —
+# come back from ONE statement via UNION ALL, tagged with a bucket column,
+# instead of paying query parse/plan/execute twice.
+_TRACKER_SQL = """
+    WITH today AS (
         SELECT
+            'snapshot' AS bucket,
             f.ticker,
             f.state,
             f.stable_days,
             f.day0_high,
             f.impulse_date,
+            f.snapshot_date,
             COALESCE(i.change_pct, 0.0) AS change_pct,
             f.failure_reason
         FROM   funnel_snapshots f
@@ -249,28 +710,18 @@ def print_tracker(
                ON i.ticker     = f.ticker
               AND i.trade_date = f.impulse_date
         WHERE  f.snapshot_date = ?
-        ORDER  BY
-            CASE f.state
-                WHEN 'watchlist'     THEN 1
-                WHEN 'consolidating' THEN 2
-                WHEN 'impulse'       THEN 3
-                WHEN 'fallout'       THEN 4
-            END,
-            f.stable_days DESC,
-            f.ticker
-    """, [target]).fetchall()
-
-    watchlist     = [r for r in rows if r[1] == "watchlist"]
-    consolidating = [r for r in rows if r[1] == "consolidating"]
-    impulses      = [r for r in rows if r[1] == "impulse"]
-
-    # Recent fallouts from all history, not just today (last 10)
-    fallout_rows = conn.execute("""
+    ),
+    fallouts AS (
         SELECT
+            'fallout' AS bucket,
             f.ticker,
+            f.state,
+            f.stable_days,
+            f.day0_high,
+            f.impulse_date,
             f.snapshot_date,
-            f.failure_reason,
-            COALESCE(i.change_pct, 0.0) AS change_pct
+            COALESCE(i.change_pct, 0.0) AS change_pct,
+            f.failure_reason
         FROM   funnel_snapshots f
         LEFT JOIN impulse_signals i
                ON i.ticker     = f.ticker
@@ -278,7 +729,50 @@ def print_tracker(
         WHERE  f.state = 'fallout'
         ORDER  BY f.snapshot_date DESC
         LIMIT  10
-    """).fetchall()
+    )
+    SELECT * FROM (
+        SELECT * FROM today
+        UNION ALL
+        SELECT * FROM fallouts
+    )
+    ORDER  BY
+        bucket DESC,
+        CASE state
+            WHEN 'watchlist'     THEN 1
+            WHEN 'consolidating' THEN 2
+            WHEN 'impulse'       THEN 3
+            WHEN 'fallout'       THEN 4
+        END,
+        snapshot_date DESC,
+        stable_days DESC,
+        ticker
+"""
+
+
+def print_tracker(
+    conn:               duckdb.DuckDBPyConnection,
+    consolidation_days: int = 4,
+    as_of:              date | None = None,
+) -> None:
+    """Print the current funnel state from funnel_snapshots in four sections."""
+    target = as_of or date.today()
+    W      = 56
+    SEP    = "━" * W
+
+    all_rows = conn.execute(_TRACKER_SQL, [target]).fetchall()
+
+    rows = [
+        (r[1], r[2], r[3], r[4], r[5], r[7], r[8])
+        for r in all_rows if r[0] == "snapshot"
+    ]
+    watchlist     = [r for r in rows if r[1] == "watchlist"]
+    consolidating = [r for r in rows if r[1] == "consolidating"]
+    impulses      = [r for r in rows if r[1] == "impulse"]
+
+    # Recent fallouts from all history, not just today (last 10)
+    fallout_rows = [
+        (r[1], r[6], r[8], r[7]) for r in all_rows if r[0] == "fallout"
+    ]
 
     print(f"\n{SEP}")
     print(f"  FUNNEL SNAPSHOT  ·  {target}")
@@ -342,10 +836,10 @@ if __name__ == "__main__":
     from src.db import get_conn
     from src.models import ImpulseSignal as _ImpulseSignal
 
-    _conditions = [
+    _conditions = (
         StabilityCondition(max_up_pct=STABLE_MAX_UP_PCT, max_down_pct=STABLE_MAX_DOWN_PCT),
         VolumeCondition(hard=False),
-    ]
+    )
 
     conn        = get_conn(DB_PATH)
     today       = _dt.date.today()
@@ -1,7 +1,22 @@
 from datetime import date
 import duckdb
 import polars as pl
-from src.models import ImpulseSignal
+from src.models import ImpulseSignal, _now
+
+# Canonical per-call statement text — see the SQL-constants note in src/db.py.
+_IMPULSE_SQL = """
+    SELECT
+        ticker,
+        trade_date,
+        ROUND(open, 2)                           AS open,
+        ROUND(close, 2)                          AS close,
+        ROUND((close - open) / open * 100, 2)    AS change_pct
+    FROM candles
+    WHERE trade_date = ?
+      AND interval = ?
+      AND open > 0
+      AND (close - open) / open * 100 >= ?
+"""
 
 
 def find_impulses(
@@ -11,43 +26,30 @@ def find_impulses(
     interval: str = "1d",
 ) -> list[ImpulseSignal]:
     """
-    Read candles via DuckDB → analyse with Polars → return ImpulseSignal objects.
-    """
-    # Step 1: Read raw data via DuckDB API → Polars DataFrame
-    df: pl.DataFrame = conn.execute("""
-        SELECT
-            ticker,
-            CAST(datetime AS DATE)         AS trade_date,
-            open,
-            close,
-            ((close - open) / open * 100)  AS change_pct
-        FROM candles
-        WHERE CAST(datetime AS DATE) = ?
-          AND interval = ?
-          AND open > 0
-    """, [trade_date, interval]).pl()
+    Detect impulses entirely inside DuckDB and return ImpulseSignal objects.
 
-    # Step 2: Analyse with Polars — filter only positive moves >= threshold (BULL only)
-    hits = (
-        df
-        .with_columns(
-            pl.lit("BULL").alias("direction"),
-        )
-        .filter(pl.col("change_pct") >= threshold)
-    )
+    The threshold filter and the 2-decimal rounding both run in the SQL
+    statement, so DuckDB's vectorized engine does the heavy lifting and
+    only the handful of matching rows (BULL only) ever cross into Python.
+    No intermediate DataFrame is materialized.
+    """
+    rows = conn.execute(_IMPULSE_SQL, [trade_date, interval, threshold]).fetchall()
 
-    # Step 3: Convert Polars rows → Pydantic ImpulseSignal objects
+    # One shared timestamp for the whole batch — per-row clock precision
+    # buys nothing and skipping the per-instance factory call is free.
+    detected = _now()
     return [
         ImpulseSignal(
-            ticker=row["ticker"],
-            trade_date=row["trade_date"],
-            open=round(row["open"], 2),
-            close=round(row["close"], 2),
-            change_pct=round(row["change_pct"], 2),
-            direction=row["direction"],
+            ticker=t,
+            trade_date=td,
+            open=o,
+            close=c,
+            change_pct=chg,
+            direction="BULL",
             interval=interval,
+            detected_at=detected,
         )
-        for row in hits.to_dicts()
+        for t, td, o, c, chg in rows
     ]
 
 
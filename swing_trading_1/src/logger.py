@@ -22,6 +22,7 @@ All subsequent get_logger() calls reuse the already-configured root logger.
 
 from __future__ import annotations
 
+import atexit
 import logging
 import sys
 from datetime import date, datetime
@@ -32,7 +33,32 @@ _FMT_FILE = "%(asctime)s  %(levelname)-8s  %(name)-28s  %(message)s"
 _FMT_CON  = "%(levelname)-8s  %(message)s"
 _DATE_FMT = "%Y-%m-%d %H:%M:%S"
 
-_configured = False   # guard so setup_logging is idempotent
+_configured = False          # guard so setup_logging is idempotent
+_log_path: Path | None = None
+
+
+class _BufferedFileHandler(logging.StreamHandler):
+    """
+    StreamHandler minus the per-record flush.
+
+    StreamHandler.emit calls self.flush() after every record, which
+    defeats any buffering on the underlying stream — each DEBUG line
+    would still be written through to the OS individually. This emit
+    only writes, so records accumulate in the stream's 64 KiB buffer
+    and reach disk in large chunks. ERROR and above still flush
+    immediately so the cause of a crash is on disk before any fallout;
+    the atexit flush and logging's own shutdown handler drain the tail.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
 
 def setup_logging(run_date: date | None = None) -> Path:
@@ -42,7 +68,7 @@ def setup_logging(run_date: date | None = None) -> Path:
 
     Safe to call multiple times — only the first call has any effect.
     """
-    global _configured
+    global _configured, _log_path
     if _configured:
         return _current_log_file()
 
@@ -56,7 +82,11 @@ def setup_logging(run_date: date | None = None) -> Path:
     root.setLevel(logging.DEBUG)
 
     # ── File handler — full detail ──────────────────────────────────────────
-    fh = logging.FileHandler(log_path, encoding="utf-8")
+    # DEBUG lines batch in the 64 KiB stream buffer (see
+    # _BufferedFileHandler); the atexit flush covers the tail.
+    fstream = open(log_path, "a", encoding="utf-8", buffering=64 * 1024)
+    atexit.register(fstream.flush)
+    fh = _BufferedFileHandler(fstream)
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(logging.Formatter(_FMT_FILE, datefmt=_DATE_FMT))
     root.addHandler(fh)
@@ -72,15 +102,13 @@ def setup_logging(run_date: date | None = None) -> Path:
         logging.getLogger(noisy).setLevel(logging.ERROR)
 
     _configured = True
+    _log_path   = log_path
     return log_path
 
 
 def _current_log_file() -> Path:
-    """Return the path of the first FileHandler on the root logger, if any."""
-    for h in logging.getLogger().handlers:
-        if isinstance(h, logging.FileHandler):
-            return Path(h.baseFilename)
-    return _LOG_DIR / "pipeline.log"
+    """Return the path of the log file created by setup_logging, if any."""
+    return _log_path if _log_path is not None else _LOG_DIR / "pipeline.log"
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -1,9 +1,20 @@
-from datetime import date, datetime
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from enum import Enum
 from typing import Literal
 from pydantic import BaseModel, Field
 
 
+def _now() -> datetime:
+    """Timestamp factory for ingested_at/detected_at/ran_at defaults.
+
+    datetime.utcnow() is deprecated from 3.12 and naive; this returns an
+    aware UTC timestamp and gives hot loops one callable to invoke (or
+    call once and share — per-row precision is not needed).
+    """
+    return datetime.now(timezone.utc)
+
+
 class StockState(str, Enum):
     IMPULSE       = "impulse"       # Day 0 — just hit the threshold
     CONSOLIDATING = "consolidating" # Days 1-3 — stable, accumulating
@@ -30,7 +41,7 @@ class CandleRecord(BaseModel):
     low:         float
     close:       float
     volume:      float
-    ingested_at: datetime = Field(default_factory=datetime.utcnow)
+    ingested_at: datetime = Field(default_factory=_now)
 
 
 class ImpulseSignal(BaseModel):
@@ -42,7 +53,32 @@ class ImpulseSignal(BaseModel):
     change_pct:  float
     direction:   Literal["BULL", "BEAR"]
     interval:    str
-    detected_at: datetime = Field(default_factory=datetime.utcnow)
+    detected_at: datetime = Field(default_factory=_now)
+
+
+@dataclass(slots=True)
+class ImpulseRow:
+    """
+    Plain transport row for impulse signals read back out of our own
+    impulse_signals table — field-compatible with ImpulseSignal but without
+    Pydantic validation.
+
+    Rows come from a SELECT whose column order matches the field order, so
+    the fetch loop constructs these positionally (ImpulseRow(*row)): no
+    kwargs dict per row, no validation of data we wrote ourselves, and
+    slots=True drops the per-instance __dict__. Consumers (the funnel
+    processor) access fields by attribute only, so either type works. Keep
+    the field list in sync with ImpulseSignal, which remains the validating
+    model at I/O boundaries.
+    """
+    ticker:      str
+    trade_date:  date
+    open:        float
+    close:       float
+    change_pct:  float
+    direction:   str
+    interval:    str
+    detected_at: datetime
 
 
 class RunLog(BaseModel):
@@ -52,7 +88,7 @@ class RunLog(BaseModel):
     tickers_processed: int
     candles_written:   int
     impulses_found:    int
-    ran_at:            datetime = Field(default_factory=datetime.utcnow)
+    ran_at:            datetime = Field(default_factory=_now)
     error:             str = ""
 
 
@@ -100,3 +136,28 @@ class FunnelSnapshot(BaseModel):
     day0_high:      float      = 0.0        # stability anchor (Day 0 high price)
     day0_volume:    float      = 0.0        # Day 0 volume — for volume flagging
     failure_reason: str        = ""         # if state=FALLOUT: explains why and which day
+
+
+@dataclass(slots=True)
+class FunnelSnapshotRow:
+    """
+    Plain transport row for funnel snapshots — field-compatible with
+    FunnelSnapshot but without Pydantic validation.
+
+    compute_funnel_state builds one of these per active impulse per day;
+    the inputs are values the funnel itself just computed (not external
+    data), so re-validating every instance only adds per-object overhead
+    in the hot path. A slotted dataclass skips validation and the
+    per-instance __dict__. Downstream consumers (db.write_funnel_snapshots,
+    the backtest engine, the tracker) access fields by attribute only, so
+    either type works. Keep the field list in sync with FunnelSnapshot,
+    which remains the validating model at I/O boundaries.
+    """
+    ticker:         str
+    snapshot_date:  date
+    impulse_date:   date
+    state:          StockState
+    stable_days:    int   = 0
+    day0_high:      float = 0.0
+    day0_volume:    float = 0.0
+    failure_reason: str   = ""
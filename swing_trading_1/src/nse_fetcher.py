@@ -1,8 +1,11 @@
-import io
+import csv
+import functools
 import json
+import pickle
+import time
+import numpy as np
 import requests
-import pandas as pd
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
 
 from src.logger import get_logger
@@ -19,7 +22,8 @@ NSE_INDEX_MAP = {
 
 _BASE_URL          = "https://niftyindices.com/IndexConstituent/"
 _HOLIDAY_API_URL   = "https://www.nseindia.com/api/holiday-master?type=trading"
-_HOLIDAY_CACHE     = Path(__file__).parent.parent / "data" / "nse_holidays_cache.json"
+_HOLIDAY_CACHE      = Path(__file__).parent.parent / "data" / "nse_holidays_cache.pkl"
+_HOLIDAY_CACHE_JSON = Path(__file__).parent.parent / "data" / "nse_holidays_cache.json"  # legacy format, read-only
 
 # NSE blocks requests without a browser User-Agent
 _HEADERS = {
@@ -36,30 +40,133 @@ _HOLIDAY_HEADERS = {
     "Referer": "https://www.nseindia.com/",
 }
 
+# One pooled session for every NSE call in the process. Reusing the
+# connection skips the TCP+TLS handshake on the second and later requests
+# — these endpoints are latency-bound, not bandwidth-bound.
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=requests.adapters.Retry(total=3, backoff_factor=0.3),
+))
+_session_warmed = False   # nseindia.com cookie warm-up done once per process
+
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Ticker resolution
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Index constituents change at most quarterly, but resolve_tickers sits on
+# every pipeline/backfill startup path — memoize per index with a TTL so
+# repeated runs in one process skip the NSE round-trip entirely. A disk
+# cache (7-day TTL) covers repeated invocations across processes: the
+# daily pipeline run then pays zero network calls most of the week.
+_TICKER_TTL_S      = 86400
+_TICKER_DISK_TTL_S = 7 * 86400
+_TICKER_CACHE_DIR  = Path(__file__).parent.parent / "data"
+_ticker_memo: dict[str, tuple[float, list[str]]] = {}
+
+
+def _ticker_cache_file(index_key: str) -> Path:
+    return _TICKER_CACHE_DIR / f"nse_tickers_{index_key}.json"
+
+
+def _read_ticker_cache(cache_file: Path) -> tuple[list[str] | None, dict[str, str]]:
+    """Return (tickers, HTTP validators) from a ticker cache file.
+
+    Current format is {"etag": ..., "last_modified": ..., "tickers": [...]};
+    a bare list (the pre-validator layout) is still accepted.
+    """
+    try:
+        blob = json.loads(cache_file.read_text())
+    except Exception:
+        return None, {}
+    if isinstance(blob, dict):
+        validators = {k: blob[k] for k in ("etag", "last_modified") if blob.get(k)}
+        return blob.get("tickers"), validators
+    return blob, {}
+
+
+def _conditional_headers(base: dict[str, str], validators: dict[str, str]) -> dict[str, str]:
+    """Copy base headers, adding If-None-Match/If-Modified-Since when we hold
+    validators from a previous response — the server then answers 304 with no
+    body if the resource is unchanged."""
+    headers = dict(base)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
 def resolve_tickers(index_name: str, verbose: bool = False) -> list[str]:
     """Fetch tickers from NSE for a given index name (e.g. 'NIFTY_200').
     The `verbose` parameter is kept for backwards compatibility but has no effect —
     logging is now handled via the standard logger.
+
+    Results are memoized in-process for 24h per index, so only the first
+    call in a run pays the network fetch.
     """
-    suffix = NSE_INDEX_MAP.get(index_name.upper())
+    key    = index_name.upper()
+    suffix = NSE_INDEX_MAP.get(key)
     if not suffix:
         raise ValueError(f"Unknown index '{index_name}'. Choose from: {list(NSE_INDEX_MAP)}")
 
+    hit = _ticker_memo.get(key)
+    if hit is not None and time.time() - hit[0] < _TICKER_TTL_S:
+        return list(hit[1])
+
+    # Fresh disk cache → no HTTP round-trip at all for this process
+    cache_file = _ticker_cache_file(key)
+    cached_tickers: list[str] | None = None
+    validators:     dict[str, str]   = {}
+    if cache_file.exists():
+        cached_tickers, validators = _read_ticker_cache(cache_file)
+        if (cached_tickers is not None
+                and time.time() - cache_file.stat().st_mtime < _TICKER_DISK_TTL_S):
+            _ticker_memo[key] = (time.time(), cached_tickers)
+            return list(cached_tickers)
+
     url = _BASE_URL + suffix
     log.info("fetching %s tickers from NSE", index_name)
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
-        resp.raise_for_status()
-        df = pd.read_csv(io.StringIO(resp.text))
-        tickers = [s.strip() + ".NS" for s in df["Symbol"].tolist()]
+        # One string column out of a ~500-row CSV — the stdlib csv module
+        # does that without pandas' type inference and block allocation
+        # (and without importing pandas on the pipeline startup path).
+        # stream=True feeds iter_lines straight off the socket, so rows are
+        # parsed as they decompress instead of buffering the full body into
+        # resp.text first.
+        with _SESSION.get(url, headers=_conditional_headers(_HEADERS, validators),
+                          timeout=15, stream=True) as resp:
+            if resp.status_code == 304 and cached_tickers is not None:
+                # Not Modified — zero body transferred; the stale cache is
+                # still current, so just reset its TTL clock.
+                log.info("%s unchanged upstream (304) — reusing cached tickers", index_name)
+                cache_file.touch()
+                _ticker_memo[key] = (time.time(), cached_tickers)
+                return list(cached_tickers)
+            resp.raise_for_status()
+            reader  = csv.DictReader(resp.iter_lines(decode_unicode=True))
+            tickers = [row["Symbol"].strip() + ".NS" for row in reader]
+            etag    = resp.headers.get("ETag")
+            last_mod = resp.headers.get("Last-Modified")
         log.info("fetched %d tickers from %s", len(tickers), index_name)
+        _ticker_memo[key] = (time.time(), tickers)
+        try:
+            _TICKER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(
+                {"etag": etag, "last_modified": last_mod, "tickers": tickers}))
+        except Exception as cache_exc:          # cache write is best-effort
+            log.warning("could not write ticker cache %s: %s", cache_file, cache_exc)
         return tickers
     except Exception as e:
+        # Same pattern as get_nse_holidays: a stale disk cache beats failing
+        # the whole run when NSE is unreachable.
+        if cached_tickers is not None:
+            log.warning("failed to fetch %s from NSE (%s) — using stale ticker cache",
+                        index_name, e)
+            _ticker_memo[key] = (time.time(), cached_tickers)
+            return list(cached_tickers)
         log.error("failed to fetch %s from NSE: %s", index_name, e)
         raise
 
@@ -69,61 +176,115 @@ def resolve_tickers(index_name: str, verbose: bool = False) -> list[str]:
 # ──────────────────────────────────────────────────────────────────────────────
 
 def _nse_session() -> requests.Session:
-    """Create a session with NSE cookies (required by the holiday API)."""
-    session = requests.Session()
-    session.headers.update(_HOLIDAY_HEADERS)
-    try:
-        session.get("https://www.nseindia.com", timeout=10)
-    except Exception:
-        pass
-    return session
+    """Return the shared session, warmed with NSE cookies (required by the
+    holiday API). The warm-up request runs once per process."""
+    global _session_warmed
+    if not _session_warmed:
+        try:
+            _SESSION.get("https://www.nseindia.com", headers=_HOLIDAY_HEADERS, timeout=10)
+        except Exception:
+            pass
+        _session_warmed = True
+    return _SESSION
 
 
-def get_nse_holidays(year: int | None = None) -> set[date]:
-    """
-    Return a set of NSE exchange holidays (Capital Market segment) for the given year.
+# Month-abbreviation lookup for the holiday API's "26-Jan-2026" dates —
+# a dict hit per entry instead of strptime re-parsing its format string.
+_MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+     "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
 
-    Fetches from NSE's official API and caches to data/nse_holidays_cache.json.
-    Falls back to disk cache if the API is unreachable.
-    """
-    year = year or date.today().year
 
-    # Load disk cache
-    cache: dict = {}
+def _load_holiday_cache() -> tuple[dict[int, frozenset[date]], dict[str, str]]:
+    """Read the on-disk holiday cache as ({year: frozenset[date]}, validators).
+
+    The cache is a pickle: date objects deserialize natively, so a cache
+    hit skips the per-entry date.fromisoformat calls the old JSON format
+    needed. Current layout is {"years": ..., "validators": ...}; a bare
+    year-map pickle and the legacy JSON file are both still read as
+    migration fallbacks — the next successful fetch rewrites the cache in
+    the new format.
+    """
     if _HOLIDAY_CACHE.exists():
         try:
-            cache = json.loads(_HOLIDAY_CACHE.read_text())
+            blob = pickle.loads(_HOLIDAY_CACHE.read_bytes())
+            if "years" in blob:
+                return blob["years"], blob.get("validators", {})
+            return blob, {}
+        except Exception:
+            pass
+    if _HOLIDAY_CACHE_JSON.exists():
+        try:
+            raw = json.loads(_HOLIDAY_CACHE_JSON.read_text())
+            return {int(y): frozenset(date.fromisoformat(d) for d in ds)
+                    for y, ds in raw.items()}, {}
         except Exception:
             pass
+    return {}, {}
+
 
-    if str(year) in cache:
-        return {date.fromisoformat(d) for d in cache[str(year)]}
+def get_nse_holidays(year: int | None = None) -> set[date]:
+    """
+    Return a set of NSE exchange holidays (Capital Market segment) for the given year.
+
+    Fetches from NSE's official API and caches to data/nse_holidays_cache.pkl.
+    Falls back to disk cache if the API is unreachable. Results are also
+    memoized in-process per year, so only the first lookup for a year pays
+    the disk read and unpickle.
+    """
+    return _get_nse_holidays_cached(year or date.today().year)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_nse_holidays_cached(year: int) -> set[date]:
+    cache, validators = _load_holiday_cache()
+    if year in cache:
+        return set(cache[year])
 
     holidays: set[date] = set()
     try:
         session  = _nse_session()
-        resp     = session.get(_HOLIDAY_API_URL, timeout=15)
+        resp     = session.get(_HOLIDAY_API_URL,
+                               headers=_conditional_headers(_HOLIDAY_HEADERS, validators),
+                               timeout=15)
+        if resp.status_code == 304 and cache:
+            # Not Modified — the cached body is current and genuinely has
+            # no entries for this year, so there is nothing to re-parse.
+            log.info("NSE holiday list unchanged upstream (304) — no entries for %d", year)
+            return holidays
         resp.raise_for_status()
         data     = resp.json()
 
         # "CM" = Capital Market (equities)
+        by_year: dict[int, set[date]] = {}
         for entry in data.get("CM", []):
             raw = entry.get("tradingDate", "")
             try:
-                d = datetime.strptime(raw, "%d-%b-%Y").date()
-                cache.setdefault(str(d.year), [])
-                cache[str(d.year)].append(d.isoformat())
+                dd, mon, yyyy = raw.split("-")
+                d = date(int(yyyy), _MONTHS[mon], int(dd))
+                by_year.setdefault(d.year, set()).add(d)
                 if d.year == year:
                     holidays.add(d)
-            except ValueError:
+            except (KeyError, ValueError):
                 continue
 
-        # Persist updated cache
+        # Persist updated cache (merge with any years already on disk),
+        # alongside the response validators for the next conditional GET.
+        for y, ds in by_year.items():
+            cache[y] = frozenset(cache.get(y, frozenset()) | ds)
+        validators = {k: v for k, v in (("etag", resp.headers.get("ETag")),
+                                        ("last_modified", resp.headers.get("Last-Modified")))
+                      if v}
         _HOLIDAY_CACHE.parent.mkdir(parents=True, exist_ok=True)
-        # Deduplicate and sort each year's entries
-        for y in cache:
-            cache[y] = sorted(set(cache[y]))
-        _HOLIDAY_CACHE.write_text(json.dumps(cache, indent=2))
+        _HOLIDAY_CACHE.write_bytes(pickle.dumps(
+            {"years": cache, "validators": validators},
+            protocol=pickle.HIGHEST_PROTOCOL))
+
+        # The fetch refreshed every year's entries on disk — drop previously
+        # memoized years so they re-read the fresh cache. (This call's own
+        # result is stored by lru_cache after the function returns, so it
+        # survives the clear.)
+        _get_nse_holidays_cached.cache_clear()
 
     except Exception as exc:
         log.warning("could not fetch NSE holidays: %s — using cache/empty", exc)
@@ -152,16 +313,39 @@ def is_trading_day(check_date: date | None = None) -> tuple[bool, str]:
     return True, f"{check_date} is a trading day"
 
 
-def filter_trading_days(dates: list[date]) -> tuple[list[date], list[tuple[date, str]]]:
+def filter_trading_days(
+    dates: list[date],
+    holidays: set[date] | None = None,
+) -> tuple[list[date], list[tuple[date, str]]]:
     """
     Split a list of dates into (trading_days, skipped).
     skipped is a list of (date, reason) tuples.
+
+    Holidays are loaded once per distinct year (not once per date, as the
+    old per-element is_trading_day loop did) and the weekend/holiday masks
+    are computed vectorized; only reason-string assembly for the (few)
+    skipped dates stays in Python. Callers that already hold the holiday
+    union for the covered years can pass it in to skip the lookup.
     """
+    if not dates:
+        return [], []
+
+    if holidays is None:
+        holidays = set()
+        for y in {d.year for d in dates}:
+            holidays |= get_nse_holidays(y)
+
+    wd     = np.fromiter((d.weekday() for d in dates), dtype=np.int8,  count=len(dates))
+    is_hol = np.fromiter((d in holidays for d in dates), dtype=np.bool_, count=len(dates))
+
     trading, skipped = [], []
-    for d in dates:
-        open_, reason = is_trading_day(d)
-        if open_:
-            trading.append(d)
+    for i, d in enumerate(dates):
+        if wd[i] == 5:
+            skipped.append((d, f"{d} is Saturday — NSE closed"))
+        elif wd[i] == 6:
+            skipped.append((d, f"{d} is Sunday — NSE closed"))
+        elif is_hol[i]:
+            skipped.append((d, f"{d} is an NSE trading holiday"))
         else:
-            skipped.append((d, reason))
+            trading.append(d)
     return trading, skipped
@@ -34,11 +34,16 @@ Single date:
 import argparse
 import sys
 import time
-import traceback
-from datetime import date, datetime
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+# Guarded: re-imports (pytest, tooling) must not prepend a duplicate entry
+# and invalidate the interpreter's path importer caches every time.
+_ROOT = str(Path(__file__).parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 from config import (
     WATCHLIST, NSE_INDEX, INTERVAL, DB_PATH,
@@ -46,8 +51,8 @@ from config import (
     STABLE_MAX_UP_PCT, STABLE_MAX_DOWN_PCT,
 )
 from src.logger import setup_logging, get_logger
-from src.nse_fetcher import resolve_tickers, filter_trading_days
-from src.models import RunLog, ImpulseSignal
+from src.nse_fetcher import resolve_tickers, filter_trading_days, get_nse_holidays
+from src.models import RunLog, ImpulseRow, StockState
 from src.fetcher import fetch_candles, fetch_candles_range
 from src.db import (
     get_conn, upsert_candles, upsert_impulses, log_run, get_missing_dates,
@@ -63,6 +68,11 @@ _W   = 56
 _SEP = "━" * _W
 _sep = "─" * _W
 
+# Log rules built once — %-style args keep all log calls lazy, and these
+# were the only messages still doing (trivial) work per call.
+_LOG_BAR  = "━" * 48
+_LOG_RULE = "─" * 48
+
 
 def get_tickers() -> tuple[list[str], str]:
     """Return (tickers, source_label) — source_label is shown in the header."""
@@ -73,13 +83,53 @@ def get_tickers() -> tuple[list[str], str]:
 
 
 # Conditions applied to Days 1-4 of consolidation — add more here to extend.
-_CONDITIONS = [
+# A tuple, not a list: the same instances are shared across every ticker and
+# every date, and freezing the collection stops any caller from mutating it.
+_CONDITIONS = (
     StabilityCondition(
         max_up_pct=STABLE_MAX_UP_PCT,
         max_down_pct=STABLE_MAX_DOWN_PCT,
     ),
     VolumeCondition(hard=False),   # soft — flags but does not eject
-]
+)
+
+
+# Canonical per-call statement text — see the SQL-constants note in src/db.py.
+_CANDLE_COUNT_SQL = """
+    SELECT COUNT(*) FROM candles WHERE trade_date = ? AND interval = ?
+"""
+
+_ACTIVE_IMPULSES_SQL = """
+    SELECT ticker, trade_date, open, close, change_pct, direction, interval, detected_at
+    FROM   impulse_signals
+    WHERE  trade_date >= ? AND trade_date <= ? AND interval = ?
+"""
+
+
+def _fetch_impulses_range(conn, start: date, end: date) -> dict[date, list[ImpulseRow]]:
+    """
+    Load every impulse with trade_date in [start, end], bucketed by trade_date.
+
+    These rows come straight back out of our own impulse_signals table, so
+    validating them through the Pydantic constructor per row only adds
+    overhead — the SELECT's column order matches ImpulseRow's field order,
+    so each tuple builds a slotted transport row positionally.
+
+    The single-date path asks for exactly one consolidation window; the
+    parallel path asks for the whole run's range once and slices each
+    date's window out of the returned dict in memory.
+    """
+    by_date: dict[date, list[ImpulseRow]] = defaultdict(list)
+    for row in conn.execute(_ACTIVE_IMPULSES_SQL, [start, end, INTERVAL]).fetchall():
+        by_date[row[1]].append(ImpulseRow(*row))
+    return by_date
+
+
+def _fetch_active_impulses(conn, trade_date: date) -> list[ImpulseRow]:
+    """Load every impulse still inside its consolidation window as of trade_date."""
+    window_start = trade_date - timedelta(days=CONSOLIDATION_DAYS + 2)
+    by_date = _fetch_impulses_range(conn, window_start, trade_date)
+    return [s for sigs in by_date.values() for s in sigs]
 
 
 def process_date(
@@ -99,14 +149,13 @@ def process_date(
 
     Returns (RunLog, watchlist_count, fallout_count).
     """
-    log.info("─" * 48)
+    log.info(_LOG_RULE)
     log.info("processing date: %s", trade_date)
     try:
         # Step 1: ingest candles (skipped when caller bulk-loaded them)
         if candles_prefetched:
             candles_written = conn.execute(
-                "SELECT COUNT(*) FROM candles WHERE DATE(datetime) = ? AND interval = ?",
-                [trade_date, INTERVAL],
+                _CANDLE_COUNT_SQL, [trade_date, INTERVAL]
             ).fetchone()[0]
             log.info("  candles    %5d  (pre-loaded)", candles_written)
         else:
@@ -120,26 +169,15 @@ def process_date(
         log.info("  impulses   %5d  detected  (≥ %s%%)", impulses_found, IMPULSE_THRESHOLD)
 
         # Step 3: compute funnel snapshots
-        import datetime as dt
-        window_start = trade_date - dt.timedelta(days=CONSOLIDATION_DAYS + 2)
-        active_rows  = conn.execute("""
-            SELECT ticker, trade_date, open, close, change_pct, direction, interval, detected_at
-            FROM   impulse_signals
-            WHERE  trade_date >= ? AND trade_date <= ? AND interval = ?
-        """, [window_start, trade_date, INTERVAL]).fetchall()
-
-        impulse_objs = [
-            ImpulseSignal(
-                ticker=r[0], trade_date=r[1], open=r[2], close=r[3],
-                change_pct=r[4], direction=r[5], interval=r[6], detected_at=r[7],
-            )
-            for r in active_rows
-        ]
+        impulse_objs = _fetch_active_impulses(conn, trade_date)
 
         snapshots       = compute_funnel_state(conn, trade_date, impulse_objs, _CONDITIONS, CONSOLIDATION_DAYS, INTERVAL)
         snaps_written   = write_funnel_snapshots(conn, snapshots)
-        watchlist_count = sum(1 for s in snapshots if s.state.value == "watchlist")
-        fallout_count   = sum(1 for s in snapshots if s.state.value == "fallout")
+        # One pass over the snapshots instead of one generator scan per
+        # bucket; identity comparison on the enum member, not .value strings.
+        state_counts    = Counter(s.state for s in snapshots)
+        watchlist_count = state_counts[StockState.WATCHLIST]
+        fallout_count   = state_counts[StockState.FALLOUT]
         log.info("  snapshots  %5d  written  (%d watchlist · %d fallout)",
                  snaps_written, watchlist_count, fallout_count)
 
@@ -153,6 +191,9 @@ def process_date(
             watchlist_count, fallout_count,
         )
     except Exception as e:
+        # traceback is only needed on the failure path — like pandas in the
+        # --force branch, it stays off the module's cold-start import list.
+        import traceback
         log.error("  FAILED on %s: %s", trade_date, e, exc_info=True)
         return (
             RunLog(
@@ -164,30 +205,160 @@ def process_date(
         )
 
 
-def run(from_date: date, to_date: date, force: bool = False, log_path: Path | None = None) -> None:
+def _process_dates_parallel(
+    conn,
+    dates:   list[date],
+    tickers: list[str],
+    workers: int,
+) -> list[tuple[RunLog, int, int]]:
+    """
+    Process bulk-loaded dates with a thread pool — same results as the
+    serial process_date loop, returned in date order.
+
+    DuckDB releases the GIL while executing queries, so the read side gets
+    real parallelism from threads; each worker thread uses its own cursor
+    (conn.cursor()). The funnel for date D reads impulses detected on
+    earlier dates, so the work runs in two phases — detect ALL impulses
+    first, then compute every date's funnel — and all writes plus RunLog
+    assembly stay on the main thread, preserving the single-writer,
+    in-order pattern of the serial path.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    window = timedelta(days=CONSOLIDATION_DAYS + 2)
+    local  = threading.local()
+
+    def _cursor():
+        cur = getattr(local, "cur", None)
+        if cur is None:
+            cur = conn.cursor()
+            local.cur = cur
+        return cur
+
+    def _detect(d: date):
+        cur     = _cursor()
+        candles = cur.execute(_CANDLE_COUNT_SQL, [d, INTERVAL]).fetchone()[0]
+        return candles, find_impulses(cur, d, IMPULSE_THRESHOLD, INTERVAL)
+
+    def _funnel(d: date):
+        # imp_dates/impulses_by_date are loaded once between the phases —
+        # each date slices its consolidation window out of the shared dict
+        # instead of re-querying impulse_signals.
+        lo     = bisect_left(imp_dates, d - window)
+        hi     = bisect_right(imp_dates, d)
+        active = [s for dd in imp_dates[lo:hi] for s in impulses_by_date[dd]]
+        return compute_funnel_state(
+            _cursor(), d, active, _CONDITIONS, CONSOLIDATION_DAYS, INTERVAL
+        )
+
+    results: list[tuple[RunLog, int, int]] = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            # Phase 1 — impulse detection (reads), then writes on main thread
+            detected = list(ex.map(_detect, dates))
+            counts   = {}
+            for d, (candles, signals) in zip(dates, detected):
+                counts[d] = (candles, upsert_impulses(conn, signals))
+                log.info("  %s  candles %5d  ·  impulses %3d", d, candles, counts[d][1])
+
+            # One range query loads every impulse the funnel phase can see
+            # (phase 1 just wrote the last of them), replacing a per-date
+            # active-impulse query with an in-memory window slice.
+            impulses_by_date = _fetch_impulses_range(conn, dates[0] - window, dates[-1])
+            imp_dates        = sorted(impulses_by_date)
+
+            # Phase 2 — funnel computation (reads), then ONE batched write.
+            # Snapshots are only read after the run (tracker/UI), so the
+            # whole range goes through a single staged insert instead of one
+            # statement per date. Impulse writes above stay per-date because
+            # this phase reads them back through SQL.
+            all_snaps: list = []
+            for d, snapshots in zip(dates, ex.map(_funnel, dates)):
+                all_snaps.extend(snapshots)
+                state_counts    = Counter(s.state for s in snapshots)
+                watchlist_count = state_counts[StockState.WATCHLIST]
+                fallout_count   = state_counts[StockState.FALLOUT]
+                candles, impulses_found = counts[d]
+                log.info("  %s  snapshots %4d computed  (%d watchlist · %d fallout)",
+                         d, len(snapshots), watchlist_count, fallout_count)
+                results.append((
+                    RunLog(
+                        run_date=d, status="success",
+                        tickers_processed=len(tickers),
+                        candles_written=candles,
+                        impulses_found=impulses_found,
+                    ),
+                    watchlist_count, fallout_count,
+                ))
+
+            snaps_written = write_funnel_snapshots(conn, all_snaps)
+            log.info("  snapshots %5d written in one batch (%d date(s))",
+                     snaps_written, len(dates))
+    except Exception as e:
+        log.error("parallel processing FAILED: %s", e, exc_info=True)
+        import traceback
+        done = {r[0].run_date for r in results}
+        for d in dates:
+            if d not in done:
+                results.append((
+                    RunLog(
+                        run_date=d, status="failed",
+                        tickers_processed=0, candles_written=0, impulses_found=0,
+                        error=traceback.format_exc(limit=3),
+                    ),
+                    0, 0,
+                ))
+    results.sort(key=lambda r: r[0].run_date)
+    return results
+
+
+def run(from_date: date, to_date: date, force: bool = False, log_path: Path | None = None,
+        workers: int = 1) -> None:
     t_start  = time.time()
     conn     = get_conn(DB_PATH)
     tickers, source = get_tickers()
 
     date_range = str(from_date) if from_date == to_date else f"{from_date} → {to_date}"
 
-    log.info("━" * 48)
+    log.info(_LOG_BAR)
     log.info("SWING PIPELINE  ·  %s", date_range)
     log.info("%d tickers  ·  %s  ·  interval %s", len(tickers), source, INTERVAL)
-    log.info("━" * 48)
+    log.info(_LOG_BAR)
+
+    # Holiday union for the whole run, loaded once per distinct year —
+    # both calendar paths below read from this single set.
+    holidays: set[date] = set()
+    for y in range(from_date.year, to_date.year + 1):
+        holidays |= get_nse_holidays(y)
 
     if force:
-        import datetime as dt
-        all_dates = []
-        d = from_date
-        while d <= to_date:
-            all_dates.append(d)
-            d += dt.timedelta(days=1)
-        missing, skipped = filter_trading_days(all_dates)
+        # One vectorized calendar call instead of a Python day-increment loop
+        # plus a second filtering pass: CustomBusinessDay excludes weekends
+        # and NSE holidays in C. pandas is a transitive dependency already
+        # (yfinance) and is imported lazily — only --force runs pay for it.
+        import pandas as pd
+        bdays   = pd.bdate_range(from_date, to_date, freq="C",
+                                 holidays=sorted(holidays),
+                                 weekmask="Mon Tue Wed Thu Fri")
+        missing = [ts.date() for ts in bdays]
+
+        # Skip reasons (for the log) reconstructed from the same calendar.
+        # Iterating ordinals avoids allocating a timedelta per day — dates
+        # map 1:1 onto consecutive integers.
+        skipped = []
+        for o in range(from_date.toordinal(), to_date.toordinal() + 1):
+            d = date.fromordinal(o)
+            if d.weekday() == 5:
+                skipped.append((d, f"{d} is Saturday — NSE closed"))
+            elif d.weekday() == 6:
+                skipped.append((d, f"{d} is Sunday — NSE closed"))
+            elif d in holidays:
+                skipped.append((d, f"{d} is an NSE trading holiday"))
         log.info("--force: %d trading day(s) to reprocess", len(missing))
     else:
         raw_missing = get_missing_dates(conn, from_date, to_date)
-        missing, skipped = filter_trading_days(raw_missing)
+        missing, skipped = filter_trading_days(raw_missing, holidays=holidays)
 
     for skip_date, reason in skipped:
         log.info("⏭  skipping %s — %s", skip_date, reason)
@@ -220,16 +391,25 @@ def run(from_date: date, to_date: date, force: bool = False, log_path: Path | No
     total_impulses  = 0
     total_watchlist = 0
 
-    for d in missing:
-        run_log, wl, fo = process_date(conn, d, tickers, candles_prefetched=bulk_loaded)
-        log_run(conn, run_log)
-        total_impulses  += run_log.impulses_found
-        total_watchlist += wl
+    # The two-phase parallel path needs every date's candles in the DB up
+    # front, so it only engages after a successful bulk load.
+    if workers > 1 and bulk_loaded:
+        log.info("processing %d date(s) with %d workers", len(missing), workers)
+        for run_log, wl, fo in _process_dates_parallel(conn, missing, tickers, workers):
+            log_run(conn, run_log)
+            total_impulses  += run_log.impulses_found
+            total_watchlist += wl
+    else:
+        for d in missing:
+            run_log, wl, fo = process_date(conn, d, tickers, candles_prefetched=bulk_loaded)
+            log_run(conn, run_log)
+            total_impulses  += run_log.impulses_found
+            total_watchlist += wl
 
     print_tracker(conn, consolidation_days=CONSOLIDATION_DAYS, as_of=missing[-1])
 
     elapsed = time.time() - t_start
-    log.info("━" * 48)
+    log.info(_LOG_BAR)
     log.info("Done · %d date(s) · %d impulses · %d watchlist · %.1fs",
              len(missing), total_impulses, total_watchlist, elapsed)
 
@@ -263,6 +443,8 @@ def main():
                         help="End date YYYY-MM-DD (default: today)")
     parser.add_argument("--force", action="store_true",
                         help="Reprocess dates even if already in run_log (useful after schema changes)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Thread count for per-date processing after a bulk load (default: 1, serial)")
     args = parser.parse_args()
 
     to_date = date.fromisoformat(args.to_date)
@@ -275,14 +457,14 @@ def main():
         ).fetchone()
         conn.close()
         last_run  = row[0] if row and row[0] else None
-        from_date = (last_run + __import__("datetime").timedelta(days=1)) if last_run else to_date
+        from_date = (last_run + timedelta(days=1)) if last_run else to_date
     else:
         from_date = date.fromisoformat(args.from_date)
 
     log_path = setup_logging(from_date)
     log.info("pipeline started  from=%s  to=%s  force=%s", from_date, to_date, args.force)
 
-    run(from_date, to_date, force=args.force, log_path=log_path)
+    run(from_date, to_date, force=args.force, log_path=log_path, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -20,17 +20,42 @@ Usage
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import io
 import itertools
+import json
+import os
+import pickle
 import sys
-from datetime import date
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import DB_PATH, INTERVAL
-from backtest.engine import run_backtest
+from backtest.engine import load_impulse_candidates, run_backtest
 from src.conditions import StabilityCondition, VolumeCondition
+from src.db import ensure_migrated
+
+
+# The sweep varies (threshold, days, up, down), but impulse detection only
+# depends on the threshold — so for a 3×3×3×3 grid the same candidates are
+# re-detected 27 times per threshold. Memoize the range scan per
+# (from, to, threshold, db) and let every combo share the dict; consumers
+# only read it. lru_cache is thread-safe, so the --n-jobs path shares too.
+@functools.lru_cache(maxsize=16)
+def _candidates(from_date: date, to_date: date, threshold: float, db_path: str):
+    return load_impulse_candidates(from_date, to_date, threshold, INTERVAL, db_path)
+
+
+# Conditions only depend on (up, down), so a 3×3×3×3 grid rebuilds the same
+# nine condition pairs 27 times each. They are stateless by design (see
+# src/conditions.py), so one shared tuple per band — same pattern as the
+# engine's module-level _CONDITIONS — serves every combo and every backend.
+@functools.lru_cache(maxsize=None)
+def _conditions(up: float, down: float) -> tuple:
+    return (StabilityCondition(max_up_pct=up, max_down_pct=down), VolumeCondition(hard=False))
 
 
 def _grid(args) -> list[tuple]:
@@ -41,36 +66,268 @@ def _grid(args) -> list[tuple]:
     return list(itertools.product(thresholds, days_list, ups, downs))
 
 
-def run(from_date: date, to_date: date, combos: list[tuple], db_path: str) -> list[dict]:
+# Re-running overlapping grids repeats identical backtests, so finished
+# combos are also cached on disk. The key hashes every parameter that can
+# change the result plus a DB fingerprint (mtime + size), so re-ingesting
+# candles invalidates old entries automatically. --no-cache bypasses it.
+_CACHE_DIR = Path.home() / ".cache" / "swing_trainer"
+
+
+def _db_fingerprint(db_path: str) -> str:
+    """mtime+size stamp of the DB file — changes whenever candles are re-ingested."""
+    try:
+        st = os.stat(db_path)
+        return f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        return "0:0"
+
+
+def _cache_key(combo: tuple, from_date: date, to_date: date, db_path: str) -> str:
+    payload = json.dumps({
+        "combo":    list(combo),
+        "from":     from_date.isoformat(),
+        "to":       to_date.isoformat(),
+        "interval": INTERVAL,
+        "db":       _db_fingerprint(db_path),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_get(key: str) -> dict | None:
+    try:
+        return pickle.loads((_CACHE_DIR / f"{key}.pkl").read_bytes())
+    except Exception:
+        return None   # missing or unreadable — recompute
+
+
+def _cache_put(key: str, result: dict) -> None:
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = _CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+        tmp.write_bytes(pickle.dumps(result))
+        os.replace(tmp, _CACHE_DIR / f"{key}.pkl")   # atomic, safe across threads
+    except Exception:
+        pass   # cache write is best-effort
+
+
+# --results streams every finished combo as one Parquet row so a killed
+# sweep resumes where it died instead of restarting from zero. The output
+# path is a directory of append-only part files (Parquet files cannot be
+# appended in place); each run writes its own part and a resume reads the
+# whole directory as one dataset. Rows carry the DB fingerprint so results
+# computed against stale candles are ignored, mirroring _cache_key.
+
+
+def _combo_key(combo: tuple) -> tuple:
+    threshold, days, up, down = combo
+    return (float(threshold), int(days), float(up), float(down))
+
+
+def _load_prior_results(out_dir: Path, fingerprint: str) -> dict[tuple, dict]:
+    """Completed combos from earlier part files, keyed by _combo_key."""
+    if not out_dir.is_dir() or not any(out_dir.glob("*.parquet")):
+        return {}
+    import pyarrow.parquet as pq
+    prior = {}
+    for row in pq.read_table(out_dir).to_pylist():
+        if row.pop("db_fingerprint", None) == fingerprint:
+            prior[(row["threshold"], row["days"], row["up"], row["down"])] = row
+    return prior
+
+
+def _open_results_writer(out_dir: Path, fingerprint: str):
+    """ParquetWriter on a fresh part file + a per-result append callback."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([
+        ("threshold",      pa.float64()),
+        ("days",           pa.int64()),
+        ("up",             pa.float64()),
+        ("down",           pa.float64()),
+        ("watchlist",      pa.int64()),
+        ("impulses",       pa.int64()),
+        ("conv_pct",       pa.float64()),
+        ("db_fingerprint", pa.string()),
+    ])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    writer = pq.ParquetWriter(out_dir / f"part-{datetime.now():%Y%m%d%H%M%S%f}-{os.getpid()}.parquet", schema)
+
+    def on_result(result: dict) -> None:
+        writer.write_table(pa.Table.from_pylist(
+            [{**result, "db_fingerprint": fingerprint}], schema=schema))
+
+    return writer, on_result
+
+
+# Process-pool worker state: each worker opens one read-only DuckDB
+# connection in its initializer and reuses it for every combo it runs, so
+# per-combo open/close cost disappears and DuckDB's buffer cache persists
+# across combos within the worker. PRAGMA threads=1 stops each worker from
+# spawning its own intra-query threads when the pool already fills the CPUs.
+_worker_conn = None
+
+
+def _init_worker(db_path: str) -> None:
+    global _worker_conn
+    import duckdb
+    _worker_conn = duckdb.connect(db_path, read_only=True)
+    _worker_conn.execute("PRAGMA threads=1")
+
+
+def _eval_combo_in_worker(combo: tuple, from_date: date, to_date: date, db_path: str,
+                          use_cache: bool) -> dict:
+    return _eval_combo(combo, from_date, to_date, db_path, use_cache, conn=_worker_conn)
+
+
+def _eval_combo(combo: tuple, from_date: date, to_date: date, db_path: str,
+                use_cache: bool = True, conn=None) -> dict:
+    """Run one grid point and return its result row."""
+    key = _cache_key(combo, from_date, to_date, db_path) if use_cache else None
+    if key is not None:
+        hit = _cache_get(key)
+        if hit is not None:
+            return hit
+    threshold, days, up, down = combo
+    conds = _conditions(up, down)
+    stats = run_backtest(
+        from_date          = from_date,
+        to_date            = to_date,
+        conditions         = conds,
+        consolidation_days = days,
+        threshold          = threshold,
+        db_path            = db_path,
+        out                = io.StringIO(),   # suppress output
+        impulses_by_date   = _candidates(from_date, to_date, threshold, db_path),
+        conn               = conn,
+    )
+    conv = (stats["watchlist"] / stats["impulses"] * 100) if stats["impulses"] else 0.0
+    result = {
+        "threshold": threshold,
+        "days":      days,
+        "up":        up,
+        "down":      down,
+        "watchlist": stats["watchlist"],
+        "impulses":  stats["impulses"],
+        "conv_pct":  conv,
+    }
+    if key is not None:
+        _cache_put(key, result)
+    return result
+
+
+def _evaluate_all(from_date: date, to_date: date, combos: list[tuple], db_path: str,
+                  n_jobs: int, use_cache: bool, backend: str = "thread",
+                  on_result=None) -> list[dict]:
+    """Evaluate every combo over [from_date, to_date]; results in combo order.
+
+    on_result, when given, is called with each result dict as soon as it is
+    collected (in combo order) — the streaming hook for --results.
+    """
     results = []
     n       = len(combos)
-    for i, (threshold, days, up, down) in enumerate(combos, 1):
-        conds = [StabilityCondition(max_up_pct=up, max_down_pct=down), VolumeCondition(hard=False)]
-        print(f"\r  [{i:>{len(str(n))}}/{n}]  thresh={threshold}  days={days}  "
-              f"up={up}  down={down}  ...", end="", flush=True)
-        stats = run_backtest(
-            from_date          = from_date,
-            to_date            = to_date,
-            conditions         = conds,
-            consolidation_days = days,
-            threshold          = threshold,
-            db_path            = db_path,
-            out                = io.StringIO(),   # suppress output
-        )
-        conv = (stats["watchlist"] / stats["impulses"] * 100) if stats["impulses"] else 0.0
-        results.append({
-            "threshold": threshold,
-            "days":      days,
-            "up":        up,
-            "down":      down,
-            "watchlist": stats["watchlist"],
-            "impulses":  stats["impulses"],
-            "conv_pct":  conv,
-        })
+    if n_jobs == 1:
+        for i, (threshold, days, up, down) in enumerate(combos, 1):
+            print(f"\r  [{i:>{len(str(n))}}/{n}]  thresh={threshold}  days={days}  "
+                  f"up={up}  down={down}  ...", end="", flush=True)
+            results.append(_eval_combo((threshold, days, up, down), from_date, to_date,
+                                       db_path, use_cache))
+            if on_result is not None:
+                on_result(results[-1])
+    elif backend == "process":
+        from concurrent.futures import ProcessPoolExecutor
+        workers = os.cpu_count() if n_jobs < 1 else n_jobs
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker, initargs=(db_path,)) as ex:
+            futs = [ex.submit(_eval_combo_in_worker, c, from_date, to_date, db_path, use_cache)
+                    for c in combos]
+            for i, fut in enumerate(futs, 1):
+                results.append(fut.result())
+                if on_result is not None:
+                    on_result(results[-1])
+                print(f"\r  [{i:>{len(str(n))}}/{n}] done", end="", flush=True)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        workers = os.cpu_count() if n_jobs < 1 else n_jobs
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futs = [ex.submit(_eval_combo, c, from_date, to_date, db_path, use_cache)
+                    for c in combos]
+            for i, fut in enumerate(futs, 1):
+                results.append(fut.result())
+                if on_result is not None:
+                    on_result(results[-1])
+                print(f"\r  [{i:>{len(str(n))}}/{n}] done", end="", flush=True)
     print()   # newline after progress
     return results
 
 
+def run(from_date: date, to_date: date, combos: list[tuple], db_path: str,
+        n_jobs: int = 1, use_cache: bool = True, halving: bool = False,
+        backend: str = "thread", results_path: str | None = None) -> list[dict]:
+    """
+    Evaluate every grid point; results come back in combo order.
+
+    n_jobs=1 (default) keeps the sequential loop with its per-combo
+    progress line. n_jobs>1 fans the combos over a pool (n_jobs=-1 uses
+    one worker per CPU). backend="thread" (default) shares one process:
+    DuckDB releases the GIL while scanning, so threads give real
+    parallelism without pickling. backend="process" isolates workers in
+    subprocesses; each opens one persistent read-only connection in its
+    initializer (PRAGMA threads=1) and reuses it for every combo, which
+    pays off when Python-side funnel work, not the scans, dominates.
+
+    halving=True prunes the grid by successive halving before the full
+    evaluation: all combos run on the most recent ~10 calendar days, the
+    top half (by watchlist, then conversion) survives, the window doubles,
+    and so on until it covers the full range — so the expensive full-range
+    backtests only run on survivors. The returned list then holds only the
+    surviving combos. The disk cache keeps partial rounds warm across
+    re-runs.
+
+    results_path points at a directory of Parquet part files: each finished
+    full-range combo is appended as one row the moment it completes, and a
+    re-run first loads that directory, skips combos already evaluated against
+    the current DB, and folds their stored rows into the returned list.
+    """
+    # Migrate once up front: workers (and the thread backend) open the DB
+    # read-only and cannot apply the trade_date migration themselves.
+    ensure_migrated(db_path)
+    if halving and len(combos) > 2:
+        survivors = list(combos)
+        span      = (to_date - from_date).days
+        window    = 10
+        while window < span and len(survivors) > 2:
+            sub_from = to_date - timedelta(days=window)
+            print(f"  halving round: {len(survivors)} combo(s) on last {window} day(s)")
+            round_results = _evaluate_all(sub_from, to_date, survivors, db_path,
+                                          n_jobs, use_cache, backend)
+            ranked    = sorted(zip(survivors, round_results),
+                               key=lambda p: (-p[1]["watchlist"], -p[1]["conv_pct"]))
+            survivors = [c for c, _ in ranked[:(len(survivors) + 1) // 2]]
+            window   *= 2
+        print(f"  halving done: {len(survivors)} combo(s) advance to the full range")
+        combos = survivors
+
+    if results_path is None:
+        return _evaluate_all(from_date, to_date, combos, db_path, n_jobs, use_cache, backend)
+
+    out_dir     = Path(results_path)
+    fingerprint = _db_fingerprint(db_path)
+    prior_by_key = _load_prior_results(out_dir, fingerprint)
+    prior  = [prior_by_key[k] for k in map(_combo_key, combos) if k in prior_by_key]
+    combos = [c for c in combos if _combo_key(c) not in prior_by_key]
+    if prior:
+        print(f"  resume: {len(prior)} combo(s) already in {out_dir}, {len(combos)} left to run")
+    if not combos:
+        return prior
+
+    writer, on_result = _open_results_writer(out_dir, fingerprint)
+    try:
+        return prior + _evaluate_all(from_date, to_date, combos, db_path,
+                                     n_jobs, use_cache, backend, on_result)
+    finally:
+        writer.close()
+
+
 def print_table(results: list[dict], top: int = 20) -> None:
     ranked = sorted(results, key=lambda r: (-r["watchlist"], -r["conv_pct"]))[:top]
     W      = 76
@@ -110,6 +367,18 @@ if __name__ == "__main__":
     parser.add_argument("--down",      default="1,2,3",  help="Max down %% from day0_high   (default: 1,2,3)")
     parser.add_argument("--top",       type=int, default=20, help="Rows to show in table    (default: 20)")
     parser.add_argument("--db-path",   default=DB_PATH,  help=f"DuckDB path (default: {DB_PATH})")
+    parser.add_argument("--n-jobs",    type=int, default=1,
+                        help="Combos evaluated in parallel; -1 = one per CPU (default: 1, sequential)")
+    parser.add_argument("--no-cache",  action="store_true",
+                        help="Ignore and skip the on-disk result cache (~/.cache/swing_trainer)")
+    parser.add_argument("--halving",   action="store_true",
+                        help="Prune the grid by successive halving on growing windows before the full run")
+    parser.add_argument("--backend",   choices=["thread", "process"], default="thread",
+                        help="Parallel backend for --n-jobs > 1: threads share one process, "
+                             "processes each keep a persistent read-only DB connection (default: thread)")
+    parser.add_argument("--results",   default=None, metavar="DIR",
+                        help="Stream finished combos to Parquet part files in DIR; "
+                             "re-running with the same DIR resumes an interrupted sweep")
     args = parser.parse_args()
 
     # enforce min consolidation_days = 4
@@ -120,9 +389,14 @@ if __name__ == "__main__":
     print(f"  {len(combos)} combinations  ·  {args.from_date} → {args.to_date}")
 
     results = run(
-        from_date = date.fromisoformat(args.from_date),
-        to_date   = date.fromisoformat(args.to_date),
-        combos    = combos,
-        db_path   = args.db_path,
+        from_date    = date.fromisoformat(args.from_date),
+        to_date      = date.fromisoformat(args.to_date),
+        combos       = combos,
+        db_path      = args.db_path,
+        n_jobs       = args.n_jobs,
+        use_cache    = not args.no_cache,
+        halving      = args.halving,
+        backend      = args.backend,
+        results_path = args.results,
     )
     print_table(results, top=args.top)
@@ -21,9 +21,9 @@ Features:
 
 import time
 import argparse
-import random
 import sys
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime, timedelta, time as dtime
 from dataclasses import dataclass, field
 from typing import Optional
 import math
@@ -47,6 +47,11 @@ def color(text, c): return f"{c}{text}{RESET}"
 LOT_SIZE        = 25          # Nifty lot size
 NIFTY_STEP      = 50          # Strike price step
 TRADE_WINDOW    = (10.5, 14.25)  # Hours (10:30 AM to 2:15 PM IST)
+# Window bounds as datetime.time — clock.now().time() compares against these
+# with a C-level field compare, so the tick loop's end-of-window check skips
+# the float hour arithmetic the fractional-hours tuple would need per tick.
+_WINDOW_LO      = dtime(int(TRADE_WINDOW[0]), round(TRADE_WINDOW[0] % 1 * 60))
+_WINDOW_HI      = dtime(int(TRADE_WINDOW[1]), round(TRADE_WINDOW[1] % 1 * 60))
 VIX_MIN, VIX_MAX = 12, 18
 MAX_TRADE_SECONDS = 3600      # 60-minute hard exit
 POLL_INTERVAL   = 2           # seconds between price checks (live)
@@ -65,14 +70,22 @@ class Clock:
         self._start_wall = time.time()
         self._sim_start  = sim_time
         self._speed      = speed  # 1 real second = `speed` simulated seconds
+        self._sim_offset = 0.0    # extra simulated seconds stepped via advance()
 
     def now(self) -> datetime:
         if not self._sim_mode:
             return datetime.now()
         elapsed_wall = time.time() - self._start_wall
-        sim_elapsed  = timedelta(seconds=elapsed_wall * self._speed)
+        sim_elapsed  = timedelta(seconds=elapsed_wall * self._speed + self._sim_offset)
         return self._sim_start + sim_elapsed
 
+    def advance(self, wall_seconds: float):
+        """Step simulated time forward as if `wall_seconds` of real time had
+        passed — lets the strategy loop replay ticks back-to-back instead of
+        sleeping through them. No-op in live mode."""
+        if self._sim_mode:
+            self._sim_offset += wall_seconds * self._speed
+
     def timestamp(self) -> float:
         return self.now().timestamp()
 
@@ -83,58 +96,108 @@ class Clock:
 # ──────────────────────────────────────────────────────────────────────────────
 # Mock Market Data Engine (Simulation)
 # ──────────────────────────────────────────────────────────────────────────────
+
+# Optional Numba JIT for the per-tick price update (same pattern as
+# src/_stability_kernel.py in the pipeline): the add/floor chain fuses into
+# one SIMD loop with no temporary array. Shocks are drawn with NumPy's
+# Generator outside the kernel — Numba does not compile that API. Strictly
+# optional; without numba the plain NumPy ufuncs give identical results.
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _walk_array(prices: np.ndarray, shocks: np.ndarray) -> None:
+        """In place: prices[i] = max(prices[i] + shocks[i], 1.0)."""
+        for i in range(prices.shape[0]):
+            p = prices[i] + shocks[i]
+            prices[i] = p if p > 1.0 else 1.0
+else:
+    def _walk_array(prices: np.ndarray, shocks: np.ndarray) -> None:
+        """In place: prices[i] = max(prices[i] + shocks[i], 1.0)."""
+        prices += shocks
+        np.maximum(prices, 1.0, out=prices)
+
+# Warm the JIT'd kernel once at import so the compile (disk-cached
+# afterwards) never lands inside a tick loop.
+_walk_array(np.ones(1), np.zeros(1))
+
 class MockMarketData:
     """
     Generates realistic-ish mock market data for simulation.
     Prices follow a GBM-like random walk.
     """
-    def __init__(self, spot: float, vix: float, direction: str = "AUTO"):
+    def __init__(self, spot: float, vix: float, direction: str = "AUTO",
+                 seed: Optional[int] = None):
         self.spot      = spot
         self.vix       = vix
         self._direction = direction
-        self._option_prices: dict[str, float] = {}
+        # Option prices live in one float64 array with a symbol→index map:
+        # tick() then updates every contract with a single vectorized draw
+        # instead of one random.gauss call per dict entry.
+        self._symbols: dict[str, int] = {}
+        self._prices  = np.empty(0, dtype=np.float64)
+        self._rng     = np.random.default_rng(seed)
         self._mu    = 0.0
         self._sigma = (vix / 100) / math.sqrt(252 * 375)  # per-tick vol
 
     def _walk(self, price: float, drift: float = 0.0) -> float:
-        """Random walk step."""
-        shock = random.gauss(drift, self._sigma * price)
+        """Random walk step (scalar — used for spot)."""
+        shock = self._rng.normal(drift, self._sigma * price)
         return max(price + shock, 1.0)
 
     def tick(self):
         """Advance all prices by one tick."""
         drift = 0.02 if self._direction == "BULLISH" else (-0.02 if self._direction == "BEARISH" else 0.0)
         self.spot = self._walk(self.spot, drift)
-        for k in list(self._option_prices):
-            self._option_prices[k] = self._walk(self._option_prices[k], drift * 0.8)
-
-    def get_ltp(self, symbol: str) -> float:
-        if symbol in ("NIFTY 50", "NIFTY50"):
-            return round(self.spot, 2)
-        # Option contract
-        if symbol not in self._option_prices:
+        if len(self._prices):
+            shocks = self._rng.normal(drift * 0.8, self._sigma * self._prices)
+            _walk_array(self._prices, shocks)
+
+    def intern(self, symbol: str) -> int:
+        """Integer contract ID for an option symbol, seeding its price on
+        first sight. The tick loop interns once at trade entry and reads
+        prices through get_ltp_id — an array index instead of hashing the
+        full symbol string on every poll. Symbol parsing only happens here,
+        in the one-time seeding path."""
+        idx = self._symbols.get(symbol)
+        if idx is None:
             # Seed option price using simple intrinsic + time value
             parts  = symbol.split("_")   # e.g. NIFTY_25300_CE
             strike = float(parts[1])
             otype  = parts[2]
             intrinsic = max(0.0, self.spot - strike) if otype == "CE" else max(0.0, strike - self.spot)
             time_val  = self.spot * self._sigma * 20   # rough theta proxy
-            self._option_prices[symbol] = round(intrinsic + time_val + random.uniform(5, 30), 2)
-        return round(self._option_prices[symbol], 2)
+            seeded    = round(intrinsic + time_val + self._rng.uniform(5, 30), 2)
+            idx = len(self._prices)
+            self._symbols[symbol] = idx
+            self._prices = np.append(self._prices, seeded)
+        return idx
+
+    def get_ltp_id(self, cid: int) -> float:
+        return round(float(self._prices[cid]), 2)
+
+    def get_ltp(self, symbol: str) -> float:
+        if symbol in ("NIFTY 50", "NIFTY50"):
+            return round(self.spot, 2)
+        return self.get_ltp_id(self.intern(symbol))
 
     def get_vwap(self, symbol: str) -> float:
         # VWAP slightly below spot in bullish, above in bearish
         if self._direction == "BULLISH":
-            return round(self.spot * random.uniform(0.9985, 0.9998), 2)
+            return round(self.spot * self._rng.uniform(0.9985, 0.9998), 2)
         elif self._direction == "BEARISH":
-            return round(self.spot * random.uniform(1.0002, 1.0015), 2)
-        return round(self.spot * random.uniform(0.9990, 1.0010), 2)
+            return round(self.spot * self._rng.uniform(1.0002, 1.0015), 2)
+        return round(self.spot * self._rng.uniform(0.9990, 1.0010), 2)
 
     def get_vix(self) -> float:
-        return round(self.vix + random.uniform(-0.2, 0.2), 2)
+        return round(self.vix + self._rng.uniform(-0.2, 0.2), 2)
 
     def get_pcr(self) -> float:
-        return round(random.uniform(0.7, 1.4), 2)
+        return round(self._rng.uniform(0.7, 1.4), 2)
 
     def determine_sentiment(self, pcr: float) -> str:
         if self._direction != "AUTO":
@@ -234,17 +297,58 @@ class DeltaDriveStrategy:
         self.tsl_trigger = tsl_trigger
         self.lot_size    = lot_size
         self.verbose     = verbose
-        self.trades: list[TradeResult] = []
+        # Trade history is stored column-wise (SoA): P&L lives in one
+        # float64 buffer grown geometrically, with parallel lists for the
+        # label columns the summary prints. Long sessions then pay ~8 bytes
+        # per trade for the numbers instead of a ten-field dataclass each,
+        # and the session totals become single NumPy reductions. The full
+        # TradeResult is only kept for the most recent trade's summary().
+        self._pnl = np.empty(1024, dtype=np.float64)
+        self._n   = 0
+        self._contracts:    list[str] = []
+        self._exit_reasons: list[str] = []
+        self.last_trade: Optional[TradeResult] = None
+        self._log_buf: list[str] = []
+        self._ts_key: tuple = ()
+        self._ts_str = ""
 
     # ── Helpers ──────────────────────────────────────────────────────────────
+    _FLUSH_EVERY  = 20   # tick-loop log lines per stdout write
+    # Exit reasons indexed by flag bit — order encodes priority (lowest set
+    # bit wins), matching the old if/break cascade exactly.
+    _EXIT_REASONS = ("STOP_LOSS", "TSL_BREAKEVEN", "TARGET", "EOD_SQUAREOFF")
+
+    def _timestamp(self) -> str:
+        """HH:MM:SS for the current clock second, re-formatted only when the
+        second rolls over. strftime re-parses its format string on every
+        call, and the tick loop stamps many lines inside the same second —
+        most calls just hand back the cached string."""
+        now = self.clock.now()
+        key = (now.hour, now.minute, now.second)
+        if key != self._ts_key:
+            self._ts_key = key
+            self._ts_str = f"{key[0]:02d}:{key[1]:02d}:{key[2]:02d}"
+        return self._ts_str
+
     def _log(self, msg: str):
         if self.verbose:
-            ts = self.clock.now().strftime("%H:%M:%S")
-            print(f"[{ts}] {msg}")
+            self._flush_logs()   # keep ordering with any buffered tick lines
+            print(f"[{self._timestamp()}] {msg}")
+
+    def _log_tick(self, msg: str):
+        """Buffered variant for the tick loop — one print() per tick takes
+        the GIL, formats, and flushes stdout every iteration, which
+        dominates fast simulations. Lines batch up and flush every
+        _FLUSH_EVERY ticks or on state transitions/exit."""
+        if self.verbose:
+            self._log_buf.append(f"[{self._timestamp()}] {msg}")
+            if len(self._log_buf) >= self._FLUSH_EVERY:
+                self._flush_logs()
 
-    def _current_minutes(self) -> float:
-        t = self.clock.now()
-        return t.hour + t.minute / 60 + t.second / 3600
+    def _flush_logs(self):
+        if self._log_buf:
+            print("\n".join(self._log_buf))
+            self._log_buf.clear()
 
     def _is_monday(self) -> bool:
         return self.clock.now().weekday() == 0
@@ -269,10 +373,8 @@ class DeltaDriveStrategy:
         if self._is_monday():
             return False, f"Monday ({now.date()}) — skipping (gap-risk day)."
 
-        cur = self._current_minutes()
-        lo, hi = TRADE_WINDOW
-        if not (lo <= cur <= hi):
-            window_str = f"{int(lo)}:{int((lo % 1)*60):02d}–{int(hi)}:{int((hi%1)*60):02d}"
+        if not (_WINDOW_LO <= now.time() <= _WINDOW_HI):
+            window_str = f"{_WINDOW_LO:%H:%M}–{_WINDOW_HI:%H:%M}"
             return False, f"Outside trading window {window_str} IST. Current: {now.strftime('%H:%M')}."
 
         vix = self.market.get_vix()
@@ -319,10 +421,21 @@ class DeltaDriveStrategy:
         # Execute trade
         result = self._execute_trade(contract, direction)
         if result:
-            self.trades.append(result)
+            self._record_trade(result)
             print(result.summary())
         return result
 
+    def _record_trade(self, result: TradeResult) -> None:
+        if self._n == self._pnl.shape[0]:
+            grown = np.empty(self._pnl.shape[0] * 2, dtype=np.float64)
+            grown[:self._n] = self._pnl[:self._n]
+            self._pnl = grown
+        self._pnl[self._n] = result.pnl
+        self._n += 1
+        self._contracts.append(result.contract)
+        self._exit_reasons.append(result.exit_reason)
+        self.last_trade = result
+
     def _nearest_expiry(self) -> str:
         """Return nearest Thursday expiry label (simplified)."""
         now = self.clock.now()
@@ -337,7 +450,19 @@ class DeltaDriveStrategy:
         start_wall    = time.time()
         current_sl    = self.stop_loss
         tsl_activated = False
-        poll          = SIM_POLL_INTERVAL if self.clock.is_simulation else POLL_INTERVAL
+        # Simulation replays ticks back-to-back: no sleep, and the clock is
+        # stepped deterministically by one poll interval per iteration, so
+        # elapsed time (and the 60-minute hard exit) is measured in simulated
+        # seconds instead of wall time.
+        sim           = self.clock.is_simulation
+        poll          = 0.0 if sim else POLL_INTERVAL
+        # Mock data interns the contract to an integer ID once, so each poll
+        # indexes the price array directly instead of re-hashing the symbol
+        # string. Live data keeps the plain symbol lookup.
+        if hasattr(self.market, "intern"):
+            cid, ltp_fn = self.market.intern(contract), self.market.get_ltp_id
+        else:
+            cid, ltp_fn = contract, self.market.get_ltp
 
         self._log(
             f"  Entry Price : ₹{entry_price:.2f}\n"
@@ -347,17 +472,17 @@ class DeltaDriveStrategy:
 
         exit_price  = entry_price
         exit_reason = "TIME_LIMIT"
+        elapsed     = 0.0
 
-        while (time.time() - start_wall) < MAX_TRADE_SECONDS:
+        while elapsed < MAX_TRADE_SECONDS:
             # Advance mock prices
             if hasattr(self.market, "tick"):
                 self.market.tick()
 
-            ltp         = self.market.get_ltp(contract)
+            ltp         = ltp_fn(cid)
             current_pnl = (ltp - entry_price) * self.lot_size
-            elapsed     = time.time() - start_wall
 
-            self._log(
+            self._log_tick(
                 f"  LTP={ltp:.2f}  P&L={color(f'₹{current_pnl:+,.0f}', GREEN if current_pnl>=0 else RED)}"
                 f"  SL={current_sl}  TSL={'ON' if tsl_activated else 'off'}"
                 f"  T+{elapsed:.0f}s"
@@ -369,30 +494,31 @@ class DeltaDriveStrategy:
                 tsl_activated = True
                 self._log(color("  ⚡ TSL Activated — SL moved to Breakeven", CYAN))
 
-            # Exit conditions
-            if current_pnl <= -current_sl and current_sl > 0:
-                exit_price  = ltp
-                exit_reason = "STOP_LOSS"
-                break
-            if tsl_activated and current_pnl < 0:
-                exit_price  = ltp
-                exit_reason = "TSL_BREAKEVEN"
-                break
-            if current_pnl >= self.target:
-                exit_price  = ltp
-                exit_reason = "TARGET"
-                break
-
-            # Check end of trading window
-            if self._current_minutes() > TRADE_WINDOW[1]:
+            # Exit conditions, packed into one flag word: the four checks
+            # run unconditionally (no chain of mispredictable branches) and
+            # a single test decides the exit. The lowest set bit picks the
+            # reason, preserving the old cascade's priority order.
+            flags = ((current_pnl <= -current_sl and current_sl > 0)
+                     | (tsl_activated and current_pnl < 0)       << 1
+                     | (current_pnl >= self.target)              << 2
+                     | (self.clock.now().time() > _WINDOW_HI)    << 3)
+            if flags:
                 exit_price  = ltp
-                exit_reason = "EOD_SQUAREOFF"
+                exit_reason = self._EXIT_REASONS[(flags & -flags).bit_length() - 1]
                 break
 
-            time.sleep(poll)
+            if poll:
+                time.sleep(poll)
+            else:
+                self.clock.advance(SIM_POLL_INTERVAL)
+            elapsed = ((self.clock.now() - entry_time).total_seconds()
+                       if sim else time.time() - start_wall)
 
+        self._flush_logs()
         exit_time = self.clock.now()
         final_pnl = (exit_price - entry_price) * self.lot_size
+        duration  = ((exit_time - entry_time).total_seconds()
+                     if sim else time.time() - start_wall)
 
         return TradeResult(
             contract      = contract,
@@ -401,7 +527,7 @@ class DeltaDriveStrategy:
             exit_price    = exit_price,
             pnl           = final_pnl,
             exit_reason   = exit_reason,
-            duration_sec  = time.time() - start_wall,
+            duration_sec  = duration,
             tsl_activated = tsl_activated,
             entry_time    = entry_time,
             exit_time     = exit_time,
@@ -409,21 +535,23 @@ class DeltaDriveStrategy:
 
     # ── Session summary ───────────────────────────────────────────────────────
     def session_summary(self):
-        if not self.trades:
+        if not self._n:
             print(color("\nNo trades taken this session.", YELLOW))
             return
-        total_pnl = sum(t.pnl for t in self.trades)
-        wins = [t for t in self.trades if t.pnl > 0]
+        pnl       = self._pnl[:self._n]
+        total_pnl = float(pnl.sum())
+        wins      = int((pnl > 0).sum())
         print(f"\n{BOLD}{'─'*60}")
-        print(f"  SESSION SUMMARY  ({len(self.trades)} trade(s))")
+        print(f"  SESSION SUMMARY  ({self._n} trade(s))")
         print(f"{'─'*60}{RESET}")
-        for i, t in enumerate(self.trades, 1):
-            sign = GREEN if t.pnl >= 0 else RED
-            print(f"  #{i}  {t.contract:<30}  {color(f'₹{t.pnl:+,.0f}', sign)}  [{t.exit_reason}]")
+        for i in range(self._n):
+            p    = pnl[i]
+            sign = GREEN if p >= 0 else RED
+            print(f"  #{i + 1}  {self._contracts[i]:<30}  {color(f'₹{p:+,.0f}', sign)}  [{self._exit_reasons[i]}]")
         print(f"{'─'*60}")
         sign = GREEN if total_pnl >= 0 else RED
         print(f"  Total P&L   : {color(f'₹{total_pnl:+,.0f}', sign)}")
-        print(f"  Win Rate    : {len(wins)}/{len(self.trades)} ({100*len(wins)//len(self.trades)}%)")
+        print(f"  Win Rate    : {wins}/{self._n} ({100*wins//self._n}%)")
         print(f"{'─'*60}{RESET}\n")
 
 
@@ -9,12 +9,20 @@ from datetime import date, timedelta
 from pathlib import Path
 
 import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from plotly.subplots import make_subplots
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Config
 # ──────────────────────────────────────────────────────────────────────────────
@@ -34,6 +42,41 @@ STATE_EMOJI = {
 }
 BULL_COLOR = "#22c55e"
 BEAR_COLOR = "#ef4444"
+# Rendered-value lookup for Series.map — on a category column pandas
+# maps each distinct value once rather than calling a lambda per row.
+STATUS_BADGE = {"success": "🟢 success", "failed": "🔴 failed"}
+
+# stable_days only ever renders as one of five bars — precomputed and
+# indexed by min(days, 4) instead of re-concatenating strings per card.
+PROGRESS_BARS = ("░░░░", "█░░░", "██░░", "███░", "████")
+
+
+# Up/down bar colours for the volume subplot, indexed by the 0/1 codes
+# _color_idx produces. JIT-compiled when Numba is available (same
+# optional `speed` dependency group as src/_stability_kernel.py) so the
+# compare-and-code pass fuses into one loop; the NumPy fallback is a
+# single ufunc call with identical results.
+_CANDLE_COLORS = np.array([BEAR_COLOR, BULL_COLOR])
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _color_idx(closes: np.ndarray, opens: np.ndarray, out: np.ndarray) -> None:
+        for i in range(closes.shape[0]):
+            out[i] = 1 if closes[i] >= opens[i] else 0
+
+    # Warm the cache so the one-off compile happens at import time.
+    _color_idx(np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.int8))
+else:
+    def _color_idx(closes: np.ndarray, opens: np.ndarray, out: np.ndarray) -> None:
+        """NumPy fallback — same contract as the Numba kernel."""
+        out[:] = closes >= opens
+
+
+def _fmt_pct(series: pd.Series, decimals: int = 1) -> np.ndarray:
+    """Sign-prefixed percent strings ('+8.0%' / '-8.0%') built with two
+    vectorized passes instead of one Python lambda call per row."""
+    v = series.to_numpy()
+    return np.char.add(np.where(v > 0, "+", ""), np.char.mod(f"%.{decimals}f%%", v))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -43,17 +86,553 @@ BEAR_COLOR = "#ef4444"
 def get_conn():
     if not DB_PATH.exists():
         return None
-    return duckdb.connect(str(DB_PATH), read_only=True)
+    conn = duckdb.connect(str(DB_PATH), read_only=True)
+    # One-time connection tuning: let DuckDB parallelise scans across the
+    # machine, and cache parsed database objects across the many small
+    # repeat queries a dashboard session issues.
+    conn.execute(f"PRAGMA threads={os.cpu_count() or 4}")
+    conn.execute("PRAGMA enable_object_cache")
+    return conn
+
+
+def get_cursor():
+    """A lightweight per-call handle onto the shared cached connection.
+    Streamlit serves each session from its own thread, and a DuckDB
+    connection must not be used from two threads mid-query; .cursor()
+    clones a handle over the same database instance (same buffer pool and
+    object cache) that is safe to use independently."""
+    conn = get_conn()
+    return None if conn is None else conn.cursor()
+
+
+# Arrow → pandas keeps integer columns nullable (as .df() did) instead of
+# silently widening NULL-bearing ints to float64.
+_ARROW_INT_DTYPES = {
+    pa.int8():  pd.Int8Dtype(),  pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype(),
+}
+
+
+# Enum-like VARCHAR columns: four funnel states, two directions, two run
+# statuses. As category dtype each cell is a small integer code into a
+# tiny value table — less memory per frame, and comparisons / groupbys /
+# value_counts run over the codes instead of the strings.
+_CATEGORY_COLS = ("state", "direction", "status")
+
+
+def _fetch_df(cur) -> pd.DataFrame:
+    """Materialise a DuckDB result via Arrow. DuckDB hands its result
+    chunks to Arrow zero-copy, and self_destruct lets the pandas
+    conversion release each Arrow buffer as it is consumed instead of
+    holding both copies live. date_as_object=False keeps DATE columns as
+    datetime64, matching what .df() returned."""
+    df = cur.to_arrow_table().to_pandas(
+        self_destruct=True, date_as_object=False,
+        types_mapper=_ARROW_INT_DTYPES.get,
+    )
+    for col in _CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
 
 
 @st.cache_data(ttl=300, show_spinner=False)
 def q(sql: str, params=None) -> pd.DataFrame:
-    conn = get_conn()
+    conn = get_cursor()
     if conn is None:
         return pd.DataFrame()
     if params:
-        return conn.execute(sql, params).df()
-    return conn.execute(sql).df()
+        return _fetch_df(conn.execute(sql, params))
+    return _fetch_df(conn.execute(sql))
+
+
+# Everything the header and Tabs 1/3 need for one (date, direction-filter)
+# pair. Direction rides along as a DuckDB list parameter so the scans
+# return only matching rows. Queries live in module constants — see the
+# SQL-constants note in swing_trading_1/src/db.py.
+_COUNTS_SQL = """
+    SELECT state, COUNT(*) as n
+    FROM funnel_snapshots
+    WHERE snapshot_date = ?
+    GROUP BY state
+"""
+
+# Tabs 1/3 share the daily_funnel join (funnel_snapshots joined to the
+# originating impulse — the same definition src/db.py persists as a view
+# for pipeline-side consumers). It is inlined here as a CTE because the
+# dashboard opens the database read-only and must keep working against
+# files that predate the view; DuckDB plans the CTE exactly like the
+# view, pushing the snapshot_date filter and the column projection into
+# the base scans.
+_DAILY_FUNNEL_CTE = """
+    WITH daily_funnel AS (
+        SELECT fs.ticker, fs.snapshot_date, fs.impulse_date, fs.state,
+               fs.stable_days, fs.day0_high, fs.day0_volume, fs.failure_reason,
+               i.direction, i.change_pct,
+               i.open  AS impulse_open, i.close AS impulse_close
+        FROM funnel_snapshots fs
+        LEFT JOIN impulse_signals i
+            ON fs.ticker = i.ticker AND fs.impulse_date = i.trade_date
+    )
+"""
+
+_WL_SQL = _DAILY_FUNNEL_CTE + """
+    SELECT ticker, substr(ticker, 1, length(ticker) - 3) AS clean_ticker,
+           impulse_date, stable_days, day0_high, day0_volume,
+           direction, change_pct, impulse_open, impulse_close
+    FROM daily_funnel
+    WHERE snapshot_date = ? AND state = 'watchlist'
+      AND direction = ANY(?)
+    ORDER BY change_pct DESC
+"""
+
+_FUNNEL_SQL = _DAILY_FUNNEL_CTE + """
+    SELECT ticker, substr(ticker, 1, length(ticker) - 3) AS clean_ticker,
+           state, stable_days, day0_high, day0_volume,
+           failure_reason, impulse_date, direction, change_pct
+    FROM daily_funnel
+    WHERE snapshot_date = ?
+      AND (direction = ANY(?) OR direction IS NULL)
+    ORDER BY state, change_pct DESC
+"""
+
+_FUNNEL_COUNTS_SQL = _DAILY_FUNNEL_CTE + """
+    SELECT state, COUNT(*) AS count
+    FROM daily_funnel
+    WHERE snapshot_date = ?
+      AND (direction = ANY(?) OR direction IS NULL)
+    GROUP BY state
+"""
+
+
+# The heatmap matrix is built by DuckDB's native PIVOT instead of
+# pandas.pivot_table + a Python groupby-apply for the top-40 cut. PIVOT is
+# rewritten into multiple statements internally and cannot carry prepared
+# parameters, so the filtered source rows are staged into a session-local
+# temp table first (allowed on a read-only connection) and the PIVOT runs
+# over that.
+_HEATMAP_SRC_SQL = """
+    CREATE OR REPLACE TEMP TABLE _heat_src AS
+    SELECT substr(ticker, 1, length(ticker) - 3) AS clean_ticker,
+           strftime(trade_date, '%b %d') AS d,
+           change_pct
+    FROM impulse_signals
+    WHERE trade_date >= ? AND direction = ANY(?)
+      AND ticker IN (
+          SELECT ticker FROM impulse_signals
+          WHERE trade_date >= ? AND direction = ANY(?)
+          GROUP BY ticker
+          ORDER BY MAX(ABS(change_pct)) DESC
+          LIMIT 40
+      )
+"""
+
+_HEATMAP_PIVOT_SQL = """
+    PIVOT _heat_src ON d USING first(change_pct) GROUP BY clean_ticker ORDER BY clean_ticker
+"""
+
+# The per-tab queries, hoisted beside the rest.
+_IMPULSES_SQL = """
+    SELECT ticker, substr(ticker, 1, length(ticker) - 3) AS clean_ticker,
+           trade_date, strftime(trade_date, '%b %d') AS display_date,
+           open, close, change_pct, direction, interval
+    FROM impulse_signals
+    WHERE trade_date >= ? AND direction = ANY(?)
+    ORDER BY trade_date DESC, change_pct DESC
+"""
+
+_DAILY_COUNT_SQL = """
+    SELECT strftime(trade_date, '%b %d') AS Date, direction, COUNT(*) AS count
+    FROM impulse_signals
+    WHERE trade_date >= ? AND direction = ANY(?)
+    GROUP BY trade_date, direction
+    ORDER BY trade_date
+"""
+
+_JOURNEY_SQL = """
+    SELECT snapshot_date, state, stable_days, failure_reason
+    FROM funnel_snapshots
+    WHERE ticker = ?
+    ORDER BY snapshot_date DESC
+    LIMIT 60
+"""
+
+# The last-60 cut and the chronological order the chart wants both happen
+# in SQL (LIMIT over the DESC scan, re-sorted in the outer query) — the
+# frame used to arrive newest-first and be re-sorted in pandas.
+_CANDLES_SQL = """
+    SELECT datetime, open, high, low, close, volume
+    FROM (
+        SELECT datetime, open, high, low, close, volume
+        FROM candles WHERE ticker = ?
+        ORDER BY datetime DESC LIMIT 60
+    )
+    ORDER BY datetime
+"""
+
+_IMP_HISTORY_SQL = """
+    SELECT trade_date, direction, open, close, change_pct
+    FROM impulse_signals WHERE ticker = ?
+    ORDER BY trade_date DESC
+"""
+
+_RUN_LOG_SQL = """
+    SELECT run_date, status, tickers_processed, candles_written, impulses_found, ran_at, error
+    FROM (
+        SELECT run_date, status, tickers_processed, candles_written, impulses_found, ran_at, error
+        FROM run_log ORDER BY run_date DESC LIMIT 90
+    )
+    ORDER BY run_date
+"""
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_heatmap(since, directions: tuple) -> pd.DataFrame:
+    """Top-40-ticker impulse matrix (ticker × display date), pivoted and
+    ranked inside DuckDB; pandas only fills the NULL gaps with zeros."""
+    conn = get_cursor()
+    if conn is None:
+        return pd.DataFrame()
+    dirs = list(directions) or ["BULL", "BEAR"]
+    conn.execute(_HEATMAP_SRC_SQL, [since, dirs, since, dirs])
+    pivot = _fetch_df(conn.execute(_HEATMAP_PIVOT_SQL))
+    conn.execute("DROP TABLE _heat_src")
+    return pivot.set_index("clean_ticker").fillna(0)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_snapshot(selected_date, directions: tuple) -> dict:
+    """
+    One cached fetch for everything keyed by the sidebar's date + direction
+    filter: header state counts, the watchlist frame, the full funnel frame
+    and its per-state counts. Four q() calls per rerun collapse into one
+    cache entry, and on a miss the four statements run back-to-back on the
+    same connection instead of re-entering the helper per query.
+
+    The watchlist honours the filter literally (empty selection → empty
+    list); the funnel treats an empty selection as "show everything" and
+    always keeps rows with no matching impulse (NULL direction).
+    """
+    conn = get_cursor()
+    if conn is None:
+        empty = pd.DataFrame()
+        return {"counts": empty, "wl": empty, "funnel": empty, "funnel_counts": empty}
+    dirs     = list(directions)
+    all_dirs = dirs or ["BULL", "BEAR"]
+    return {
+        "counts":        _fetch_df(conn.execute(_COUNTS_SQL, [selected_date])),
+        "wl":            _fetch_df(conn.execute(_WL_SQL, [selected_date, dirs])),
+        "funnel":        _fetch_df(conn.execute(_FUNNEL_SQL, [selected_date, all_dirs])),
+        "funnel_counts": _fetch_df(conn.execute(_FUNNEL_COUNTS_SQL, [selected_date, all_dirs])),
+    }
+
+
+# Small always-needed lookups, cached as plain Python values: hashing a
+# scalar or tuple cache entry on every rerun is far cheaper than hashing
+# (and copying out) a DataFrame that exists only to carry one value.
+@st.cache_data(ttl=300, show_spinner=False)
+def load_last_run():
+    """Latest pipeline run as a dict of scalars, or None when empty."""
+    conn = get_cursor()
+    if conn is None:
+        return None
+    row = conn.execute("""
+        SELECT run_date, status, tickers_processed, candles_written, impulses_found, ran_at
+        FROM run_log ORDER BY run_date DESC LIMIT 1
+    """).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("run_date", "status", "tickers_processed",
+                     "candles_written", "impulses_found", "ran_at"), row))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_max_snapshot_date():
+    """Most recent funnel snapshot date, or None when the table is empty."""
+    conn = get_cursor()
+    if conn is None:
+        return None
+    return conn.execute("SELECT MAX(snapshot_date) FROM funnel_snapshots").fetchone()[0]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_deepdive(ticker: str) -> dict:
+    """Everything Tab 4 shows for one ticker as a single cache entry:
+    funnel journey, last-60 candles and impulse history run back-to-back
+    on one cursor instead of three separate q() round trips. All three
+    filter on the leading primary-key column of their table, so each is
+    an index probe rather than a scan."""
+    conn = get_cursor()
+    if conn is None:
+        empty = pd.DataFrame()
+        return {"journey": empty, "candles": empty, "history": empty}
+    return {
+        "journey": _fetch_df(conn.execute(_JOURNEY_SQL, [ticker])),
+        "candles": _fetch_df(conn.execute(_CANDLES_SQL, [ticker])),
+        "history": _fetch_df(conn.execute(_IMP_HISTORY_SQL, [ticker])),
+    }
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_ticker_universe() -> tuple:
+    """Every distinct ticker (suffix already stripped), as a tuple."""
+    conn = get_cursor()
+    if conn is None:
+        return ()
+    rows = conn.execute("""
+        SELECT DISTINCT substr(ticker, 1, length(ticker) - 3) AS clean_ticker
+        FROM impulse_signals ORDER BY clean_ticker
+    """).fetchall()
+    return tuple(r[0] for r in rows)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Figure builders — cached so unrelated widget interactions don't rebuild them
+# ──────────────────────────────────────────────────────────────────────────────
+# Streamlit reruns the whole script on every widget event, and Plotly figure
+# construction (walking the frame, building JSON traces) is the expensive
+# part of a render. Each builder takes only the columns its figure needs, so
+# the cache key hashes a small frame and an unchanged input returns the
+# cached figure instead of rebuilding it.
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_donut(dir_counts: pd.DataFrame):
+    fig = px.pie(
+        dir_counts, values="count", names="direction",
+        color="direction",
+        color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
+        hole=0.55,
+        title="Bull vs Bear split",
+    )
+    fig.update_traces(textinfo="value+percent")
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        showlegend=True,
+        height=300,
+        margin=dict(t=40, b=0, l=0, r=0),
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_movers_bar(top: pd.DataFrame):
+    fig = px.bar(
+        top,
+        x="change_pct", y="clean_ticker",
+        orientation="h",
+        color="direction",
+        color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
+        labels={"change_pct": "Change %", "clean_ticker": "Ticker"},
+        text="change_pct",
+    )
+    fig.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=max(300, len(top) * 28),
+        margin=dict(l=80, r=40, t=10, b=40),
+        xaxis_title="Impulse Day Change %",
+        yaxis_title="",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_heatmap(pivot: pd.DataFrame):
+    fig = px.imshow(
+        pivot,
+        color_continuous_scale="RdYlGn",
+        color_continuous_midpoint=0,
+        aspect="auto",
+        title="Impulse Heatmap (% change — top 40 tickers)",
+        labels={"color": "Change %"},
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        height=max(400, len(pivot) * 18),
+        margin=dict(t=40, b=40, l=80, r=20),
+        xaxis_tickangle=-45,
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_daily_bar(daily: pd.DataFrame):
+    fig = px.bar(
+        daily, x="Date", y="count", color="direction",
+        color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
+        barmode="group",
+        title="Daily Impulse Count",
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=320,
+        margin=dict(t=40, b=40, l=20, r=20),
+        xaxis_tickangle=-45,
+        legend_title_text="",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_move_hist(moves: pd.DataFrame):
+    fig = px.histogram(
+        moves, x="change_pct", color="direction",
+        color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
+        nbins=30,
+        title="Distribution of Impulse Moves",
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=280,
+        margin=dict(t=40, b=40, l=20, r=20),
+        bargap=0.05,
+        legend_title_text="",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_funnel_fig(funnel_counts: pd.DataFrame):
+    fig = go.Figure(go.Funnel(
+        y=[f"{STATE_EMOJI.get(s, '')} {s.capitalize()}" for s in funnel_counts["state"]],
+        x=funnel_counts["count"],
+        textinfo="value+percent initial",
+        marker=dict(color=[STATE_COLORS.get(s, "#888") for s in funnel_counts["state"]]),
+    ))
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=320,
+        margin=dict(t=10, b=10, l=10, r=10),
+        title="Conversion Funnel",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_state_scatter(points: pd.DataFrame):
+    fig = px.scatter(
+        points,
+        x="stable_days",
+        y="change_pct",
+        color="state",
+        color_discrete_map=STATE_COLORS,
+        hover_name="clean_ticker",
+        hover_data={"direction": True, "day0_high": ":.2f"},
+        size_max=12,
+        title="Stable days vs Impulse strength",
+        labels={"stable_days": "Stable Days", "change_pct": "Impulse Change %"},
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=320,
+        margin=dict(t=40, b=20, l=20, r=20),
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_journey_fig(journey: pd.DataFrame, ticker: str):
+    fig = px.scatter(
+        journey, x="snapshot_date", y="state",
+        color="state",
+        color_discrete_map=STATE_COLORS,
+        hover_data={"stable_days": True, "failure_reason": True},
+        title=f"{ticker} — Funnel Journey",
+        size_max=12,
+        category_orders={"state": ["watchlist", "consolidating", "impulse", "fallout"]},
+    )
+    fig.update_traces(marker=dict(size=14))
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=280,
+        margin=dict(t=40, b=40, l=20, r=20),
+        showlegend=False,
+        yaxis_title="",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_candle_fig(candles: pd.DataFrame, ticker: str):
+    # Hand Plotly raw NumPy views — it consumes them directly, skipping the
+    # per-element Series iteration it would do for pandas inputs. The
+    # volume colors likewise come from one vectorized comparison instead of
+    # a zip() loop, which matters once the LIMIT is raised for longer
+    # deep-dives.
+    x_dt   = candles["datetime"].to_numpy()
+    opens  = candles["open"].to_numpy()
+    closes = candles["close"].to_numpy()
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True,
+        row_heights=[0.7, 0.3], vertical_spacing=0.02
+    )
+    fig.add_trace(go.Candlestick(
+        x=x_dt,
+        open=opens,
+        high=candles["high"].to_numpy(),
+        low=candles["low"].to_numpy(),
+        close=closes,
+        name="Price",
+        increasing_line_color=BULL_COLOR,
+        decreasing_line_color=BEAR_COLOR,
+    ), row=1, col=1)
+    idx = np.empty(closes.shape[0], dtype=np.int8)
+    _color_idx(closes, opens, idx)
+    colors_vol = _CANDLE_COLORS[idx]
+    fig.add_trace(go.Bar(
+        x=x_dt, y=candles["volume"].to_numpy(),
+        marker_color=colors_vol, name="Volume", showlegend=False,
+    ), row=2, col=1)
+    fig.update_layout(
+        title=f"{ticker} — Price & Volume",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=360,
+        margin=dict(t=40, b=20, l=20, r=20),
+        xaxis_rangeslider_visible=False,
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_impulse_area(log: pd.DataFrame):
+    fig = px.area(
+        log,
+        x="run_date", y="impulses_found",
+        title="Impulses Found per Day",
+        color_discrete_sequence=["#f97316"],
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=250,
+        margin=dict(t=40, b=20, l=20, r=20),
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_candles_bar(log: pd.DataFrame):
+    fig = px.bar(
+        log,
+        x="run_date", y="candles_written",
+        title="Candles Written per Day",
+        color_discrete_sequence=["#3b82f6"],
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=250,
+        margin=dict(t=40, b=20, l=20, r=20),
+    )
+    return fig
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -89,6 +668,11 @@ st.markdown("""
     .tag-fallout       { background:#ef4444; color:white; }
     .tag-bull          { background:#22c55e; color:white; }
     .tag-bear          { background:#ef4444; color:white; }
+    .grid5 {
+        display: grid;
+        grid-template-columns: repeat(5, 1fr);
+        gap: 8px;
+    }
     .stTabs [data-baseweb="tab"] { font-size: 15px; }
 </style>
 """, unsafe_allow_html=True)
@@ -101,12 +685,8 @@ with st.sidebar:
     st.markdown("---")
 
     # Last run info
-    run_log = q("""
-        SELECT run_date, status, tickers_processed, candles_written, impulses_found, ran_at
-        FROM run_log ORDER BY run_date DESC LIMIT 1
-    """)
-    if not run_log.empty:
-        last = run_log.iloc[0]
+    last = load_last_run()
+    if last is not None:
         status_color = "🟢" if last["status"] == "success" else "🔴"
         st.markdown(f"**Last Run:** {status_color} {last['run_date']}")
         st.markdown(f"**Tickers scanned:** {last['tickers_processed']:,}")
@@ -117,17 +697,9 @@ with st.sidebar:
 
     st.markdown("---")
     st.markdown("**View date**")
-    max_date_row = q("SELECT MAX(snapshot_date) as d FROM funnel_snapshots")
-    max_date = date.today()
-    if not max_date_row.empty:
-        raw = max_date_row.iloc[0]["d"]
-        # Guard against None, NaT, and any pandas NA-like values
-        try:
-            converted = pd.to_datetime(raw)
-            if converted is not pd.NaT and not pd.isnull(converted):
-                max_date = converted.date()
-        except Exception:
-            pass
+    # fetchone hands back a plain datetime.date (or None on an empty
+    # table), so the old NaT/NA guard dance is gone.
+    max_date = load_max_snapshot_date() or date.today()
     selected_date = st.date_input("Snapshot date", value=max_date)
 
     st.markdown("---")
@@ -140,12 +712,8 @@ with st.sidebar:
 # ──────────────────────────────────────────────────────────────────────────────
 st.markdown("## 📡 Swing Radar Dashboard")
 
-counts = q("""
-    SELECT state, COUNT(*) as n
-    FROM funnel_snapshots
-    WHERE snapshot_date = ?
-    GROUP BY state
-""", [selected_date])
+snapshot = load_snapshot(selected_date, tuple(dir_filter))
+counts   = snapshot["counts"]
 
 count_map = dict(zip(counts["state"], counts["n"])) if not counts.empty else {}
 
@@ -175,90 +743,38 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.subheader(f"Stocks ready for entry — {selected_date}")
 
-    wl = q("""
-        SELECT
-            fs.ticker,
-            fs.impulse_date,
-            fs.stable_days,
-            fs.day0_high,
-            fs.day0_volume,
-            i.direction,
-            i.change_pct,
-            i.open  AS impulse_open,
-            i.close AS impulse_close
-        FROM funnel_snapshots fs
-        LEFT JOIN impulse_signals i
-            ON fs.ticker = i.ticker AND fs.impulse_date = i.trade_date
-        WHERE fs.snapshot_date = ? AND fs.state = 'watchlist'
-        ORDER BY i.change_pct DESC
-    """, [selected_date])
-
-    if not dir_filter:
-        wl = wl[wl["direction"].isin([])]
-    else:
-        wl = wl[wl["direction"].isin(dir_filter)]
+    wl = snapshot["wl"]
 
     if wl.empty:
         st.info("No watchlist stocks for this date. Try a different date or run the pipeline.")
     else:
-        wl["clean_ticker"] = wl["ticker"].str.replace(".NS", "", regex=False)
-        wl["Days held"] = wl["stable_days"]
-        wl["Impulse %"] = wl["change_pct"].map(lambda x: f"+{x:.1f}%" if x > 0 else f"{x:.1f}%")
-        wl["Day 0 High"] = wl["day0_high"].map(lambda x: f"₹{x:,.2f}")
-        wl["Direction"] = wl["direction"].map(
-            lambda d: f'<span class="badge tag-bull">▲ BULL</span>'
-            if d == "BULL"
-            else f'<span class="badge tag-bear">▼ BEAR</span>'
-        )
-        wl["Ticker"] = wl["clean_ticker"]
-
         # Donut chart of bull vs bear
         dir_counts = wl["direction"].value_counts().reset_index()
         dir_counts.columns = ["direction", "count"]
         col_a, col_b = st.columns([2, 1])
         with col_a:
-            st.markdown(wl[["Ticker", "Impulse %", "Day 0 High", "Days held", "Direction"]].to_html(
-                escape=False, index=False
-            ), unsafe_allow_html=True)
-        with col_b:
-            fig_donut = px.pie(
-                dir_counts, values="count", names="direction",
-                color="direction",
-                color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
-                hole=0.55,
-                title="Bull vs Bear split",
-            )
-            fig_donut.update_traces(textinfo="value+percent")
-            fig_donut.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                showlegend=True,
-                height=300,
-                margin=dict(t=40, b=0, l=0, r=0),
+            # st.dataframe ships the raw columns to the browser as Arrow
+            # and formats them client-side; no Python-side string columns
+            # and no escape=False HTML blob rebuilt every rerun.
+            st.dataframe(
+                wl[["clean_ticker", "change_pct", "day0_high", "stable_days", "direction"]],
+                column_config={
+                    "clean_ticker": st.column_config.TextColumn("Ticker"),
+                    "change_pct":   st.column_config.NumberColumn("Impulse %", format="%+.1f%%"),
+                    "day0_high":    st.column_config.NumberColumn("Day 0 High", format="₹%.2f"),
+                    "stable_days":  st.column_config.NumberColumn("Days held"),
+                    "direction":    st.column_config.TextColumn("Direction"),
+                },
+                hide_index=True,
+                use_container_width=True,
             )
-            st.plotly_chart(fig_donut, use_container_width=True)
+        with col_b:
+            st.plotly_chart(build_donut(dir_counts), use_container_width=True)
 
         # Top impulse movers bar chart
         st.markdown("#### Top movers on Impulse Day")
-        fig_bar = px.bar(
-            wl.head(20).sort_values("change_pct"),
-            x="change_pct", y="clean_ticker",
-            orientation="h",
-            color="direction",
-            color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
-            labels={"change_pct": "Change %", "clean_ticker": "Ticker"},
-            text="change_pct",
-        )
-        fig_bar.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
-        fig_bar.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            height=max(300, len(wl.head(20)) * 28),
-            margin=dict(l=80, r=40, t=10, b=40),
-            xaxis_title="Impulse Day Change %",
-            yaxis_title="",
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        top = wl.head(20).sort_values("change_pct")[["clean_ticker", "change_pct", "direction"]]
+        st.plotly_chart(build_movers_bar(top), use_container_width=True)
 
 
 # ┌─────────────────────────────────┐
@@ -270,94 +786,40 @@ with tab2:
     days_back = st.slider("Show impulses from last N days", 1, 30, 7, key="imp_days")
     since = date.today() - timedelta(days=days_back)
 
-    impulses = q("""
-        SELECT ticker, trade_date, open, close, change_pct, direction, interval
-        FROM impulse_signals
-        WHERE trade_date >= ?
-        ORDER BY trade_date DESC, change_pct DESC
-    """, [since])
+    # An empty filter means "show everything" on this tab.
+    directions = dir_filter or ["BULL", "BEAR"]
+
+    impulses = q(_IMPULSES_SQL, [since, directions])
 
     if impulses.empty:
         st.info("No impulse data found for this period.")
     else:
-        if dir_filter:
-            impulses = impulses[impulses["direction"].isin(dir_filter)]
-
-        impulses["clean_ticker"] = impulses["ticker"].str.replace(".NS", "", regex=False)
-        impulses["Date"] = pd.to_datetime(impulses["trade_date"]).dt.strftime("%b %d")
-
         col1, col2 = st.columns([3, 2])
 
         with col1:
-            # Heatmap: tickers vs dates coloured by change_pct
-            pivot = impulses.pivot_table(
-                index="clean_ticker", columns="Date", values="change_pct", aggfunc="first"
-            ).fillna(0)
-            # Limit to top 40 by max abs move
-            top_tickers = impulses.groupby("clean_ticker")["change_pct"].apply(
-                lambda x: x.abs().max()
-            ).nlargest(40).index
-            pivot = pivot.loc[pivot.index.isin(top_tickers)]
-
-            fig_heat = px.imshow(
-                pivot,
-                color_continuous_scale="RdYlGn",
-                color_continuous_midpoint=0,
-                aspect="auto",
-                title="Impulse Heatmap (% change — top 40 tickers)",
-                labels={"color": "Change %"},
-            )
-            fig_heat.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                height=max(400, len(pivot) * 18),
-                margin=dict(t=40, b=40, l=80, r=20),
-                xaxis_tickangle=-45,
-            )
-            st.plotly_chart(fig_heat, use_container_width=True)
+            # Heatmap: tickers vs dates coloured by change_pct, pivoted and
+            # limited to the top 40 movers inside DuckDB.
+            pivot = load_heatmap(since, tuple(dir_filter))
+            st.plotly_chart(build_heatmap(pivot), use_container_width=True)
 
         with col2:
-            # Daily impulse count bar
-            daily = impulses.groupby(["Date", "direction"]).size().reset_index(name="count")
-            fig_daily = px.bar(
-                daily, x="Date", y="count", color="direction",
-                color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
-                barmode="group",
-                title="Daily Impulse Count",
-            )
-            fig_daily.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=320,
-                margin=dict(t=40, b=40, l=20, r=20),
-                xaxis_tickangle=-45,
-                legend_title_text="",
-            )
-            st.plotly_chart(fig_daily, use_container_width=True)
+            # Daily impulse count bar — aggregated inside DuckDB; the UI
+            # receives a few rows instead of grouping the full frame here.
+            daily = q(_DAILY_COUNT_SQL, [since, directions])
+            st.plotly_chart(build_daily_bar(daily), use_container_width=True)
 
             # Distribution of change_pct
-            fig_hist = px.histogram(
-                impulses, x="change_pct", color="direction",
-                color_discrete_map={"BULL": BULL_COLOR, "BEAR": BEAR_COLOR},
-                nbins=30,
-                title="Distribution of Impulse Moves",
-            )
-            fig_hist.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=280,
-                margin=dict(t=40, b=40, l=20, r=20),
-                bargap=0.05,
-                legend_title_text="",
-            )
-            st.plotly_chart(fig_hist, use_container_width=True)
+            st.plotly_chart(build_move_hist(impulses[["change_pct", "direction"]]),
+                            use_container_width=True)
 
         # Raw table (collapsible)
         with st.expander("Raw impulse data"):
-            show = impulses[["clean_ticker", "trade_date", "direction", "change_pct", "open", "close"]].copy()
+            # display_date is pre-formatted by strftime inside DuckDB.
+            show = impulses[["clean_ticker", "display_date", "direction", "change_pct", "open", "close"]].copy()
             show.columns = ["Ticker", "Date", "Direction", "Change %", "Open", "Close"]
-            show["Change %"] = show["Change %"].map(lambda x: f"+{x:.2f}%" if x > 0 else f"{x:.2f}%")
-            show["Open"]  = show["Open"].map(lambda x: f"₹{x:,.2f}")
-            show["Close"] = show["Close"].map(lambda x: f"₹{x:,.2f}")
+            show["Change %"] = _fmt_pct(show["Change %"], decimals=2)
+            show["Open"]  = show["Open"].map("₹{:,.2f}".format)
+            show["Close"] = show["Close"].map("₹{:,.2f}".format)
             st.dataframe(show, use_container_width=True)
 
 
@@ -367,70 +829,26 @@ with tab2:
 with tab3:
     st.subheader(f"🫧 Full Funnel — {selected_date}")
 
-    funnel_data = q("""
-        SELECT
-            fs.ticker, fs.state, fs.stable_days, fs.day0_high, fs.day0_volume,
-            fs.failure_reason, fs.impulse_date,
-            i.direction, i.change_pct
-        FROM funnel_snapshots fs
-        LEFT JOIN impulse_signals i
-            ON fs.ticker = i.ticker AND fs.impulse_date = i.trade_date
-        WHERE fs.snapshot_date = ?
-        ORDER BY fs.state, i.change_pct DESC
-    """, [selected_date])
+    funnel_data = snapshot["funnel"]
 
     if funnel_data.empty:
         st.info("No funnel data for this date.")
     else:
-        if dir_filter:
-            funnel_data = funnel_data[funnel_data["direction"].isin(dir_filter) | funnel_data["direction"].isna()]
-
-        funnel_data["clean_ticker"] = funnel_data["ticker"].str.replace(".NS", "", regex=False)
-
-        # Funnel chart
+        # Funnel chart — per-state counts pre-aggregated by DuckDB under
+        # the same filter, four rows instead of a pandas groupby.
         state_order = ["impulse", "consolidating", "watchlist", "fallout"]
-        funnel_counts = funnel_data.groupby("state").size().reset_index(name="count")
+        funnel_counts = snapshot["funnel_counts"]
         funnel_counts["state"] = pd.Categorical(funnel_counts["state"], categories=state_order, ordered=True)
         funnel_counts = funnel_counts.sort_values("state")
 
         col_f1, col_f2 = st.columns([1, 2])
         with col_f1:
-            fig_funnel = go.Figure(go.Funnel(
-                y=[f"{STATE_EMOJI.get(s, '')} {s.capitalize()}" for s in funnel_counts["state"]],
-                x=funnel_counts["count"],
-                textinfo="value+percent initial",
-                marker=dict(color=[STATE_COLORS.get(s, "#888") for s in funnel_counts["state"]]),
-            ))
-            fig_funnel.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=320,
-                margin=dict(t=10, b=10, l=10, r=10),
-                title="Conversion Funnel",
-            )
-            st.plotly_chart(fig_funnel, use_container_width=True)
+            st.plotly_chart(build_funnel_fig(funnel_counts), use_container_width=True)
 
         with col_f2:
             # Scatter: change_pct vs stable_days, coloured by state
-            fig_scatter = px.scatter(
-                funnel_data.dropna(subset=["change_pct"]),
-                x="stable_days",
-                y="change_pct",
-                color="state",
-                color_discrete_map=STATE_COLORS,
-                hover_name="clean_ticker",
-                hover_data={"direction": True, "day0_high": ":.2f"},
-                size_max=12,
-                title="Stable days vs Impulse strength",
-                labels={"stable_days": "Stable Days", "change_pct": "Impulse Change %"},
-            )
-            fig_scatter.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=320,
-                margin=dict(t=40, b=20, l=20, r=20),
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            st.plotly_chart(build_state_scatter(funnel_data.dropna(subset=["change_pct"])),
+                            use_container_width=True)
 
         # Per-state cards
         st.markdown("#### Stocks by state")
@@ -440,24 +858,29 @@ with tab3:
                 continue
             color = STATE_COLORS[state]
             emoji = STATE_EMOJI[state]
+            cards = subset[["clean_ticker", "direction", "change_pct",
+                            "stable_days", "failure_reason"]]
             with st.expander(f"{emoji} **{state.capitalize()}** — {len(subset)} stocks", expanded=(state == "watchlist")):
-                cols = st.columns(5)
-                for idx, row in subset.iterrows():
-                    c = cols[idx % 5]
-                    direction = row.get("direction", "")
+                # One st.markdown per expander instead of one Streamlit
+                # element per card: every element is its own protobuf
+                # message to the browser, so a 50-stock state used to ship
+                # 50 deltas where a single CSS-grid div now ships one.
+                # itertuples hands back plain tuples — no per-row Series
+                # is materialised the way iterrows would.
+                parts = []
+                for tick, direction, pct, stable_days, reason in cards.itertuples(index=False, name=None):
                     dir_badge = "▲" if direction == "BULL" else "▼" if direction == "BEAR" else ""
-                    pct = row.get("change_pct")
                     pct_str = f"{pct:+.1f}%" if pd.notna(pct) else ""
-                    stable = int(row["stable_days"]) if pd.notna(row["stable_days"]) else 0
-                    progress = "█" * stable + "░" * (4 - stable)
-                    reason = row.get("failure_reason", "") or ""
-                    c.markdown(
-                        f"""**{row['clean_ticker']}**  
-{dir_badge} {pct_str}  
-`{progress}` d{stable}  
-<small style='color:#94a3b8'>{reason[:30]}</small>""",
-                        unsafe_allow_html=True,
+                    stable = int(stable_days) if pd.notna(stable_days) else 0
+                    reason = reason or ""
+                    parts.append(
+                        f"<div><b>{tick}</b><br>"
+                        f"{dir_badge} {pct_str}<br>"
+                        f"<code>{PROGRESS_BARS[min(stable, 4)]}</code> d{stable}<br>"
+                        f"<small style='color:#94a3b8'>{reason[:30]}</small></div>"
                     )
+                st.markdown(f'<div class="grid5">{"".join(parts)}</div>',
+                            unsafe_allow_html=True)
 
 
 # ┌─────────────────────────────────┐
@@ -466,8 +889,7 @@ with tab3:
 with tab4:
     st.subheader("📈 Stock Deep-Dive")
 
-    all_tickers = q("SELECT DISTINCT ticker FROM impulse_signals ORDER BY ticker")
-    ticker_options = all_tickers["ticker"].str.replace(".NS", "", regex=False).tolist() if not all_tickers.empty else []
+    ticker_options = load_ticker_universe()
 
     if not ticker_options:
         st.info("No tickers found in the database.")
@@ -475,101 +897,38 @@ with tab4:
         selected_ticker = st.selectbox("Select a stock", ticker_options)
         full_ticker = selected_ticker + ".NS"
 
+        deepdive = load_deepdive(full_ticker)
+
         col_a, col_b = st.columns(2)
 
         with col_a:
             # Funnel journey timeline
-            journey = q("""
-                SELECT snapshot_date, state, stable_days, failure_reason
-                FROM funnel_snapshots
-                WHERE ticker = ?
-                ORDER BY snapshot_date DESC
-                LIMIT 60
-            """, [full_ticker])
+            journey = deepdive["journey"]
 
             if not journey.empty:
-                journey["snapshot_date"] = pd.to_datetime(journey["snapshot_date"])
-                journey["state_num"] = journey["state"].map(
-                    {"impulse": 1, "consolidating": 2, "watchlist": 3, "fallout": 0}
-                )
-                fig_journey = px.scatter(
-                    journey, x="snapshot_date", y="state",
-                    color="state",
-                    color_discrete_map=STATE_COLORS,
-                    hover_data={"stable_days": True, "failure_reason": True},
-                    title=f"{selected_ticker} — Funnel Journey",
-                    size_max=12,
-                    category_orders={"state": ["watchlist", "consolidating", "impulse", "fallout"]},
-                )
-                fig_journey.update_traces(marker=dict(size=14))
-                fig_journey.update_layout(
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    height=280,
-                    margin=dict(t=40, b=40, l=20, r=20),
-                    showlegend=False,
-                    yaxis_title="",
-                )
-                st.plotly_chart(fig_journey, use_container_width=True)
+                st.plotly_chart(build_journey_fig(journey, selected_ticker),
+                                use_container_width=True)
             else:
                 st.info("No funnel history for this ticker.")
 
         with col_b:
             # OHLCV candlestick
-            candles = q("""
-                SELECT datetime, open, high, low, close, volume
-                FROM candles WHERE ticker = ?
-                ORDER BY datetime DESC LIMIT 60
-            """, [full_ticker])
+            candles = deepdive["candles"]
 
             if not candles.empty:
-                candles = candles.sort_values("datetime")
-                fig_candle = make_subplots(
-                    rows=2, cols=1, shared_xaxes=True,
-                    row_heights=[0.7, 0.3], vertical_spacing=0.02
-                )
-                fig_candle.add_trace(go.Candlestick(
-                    x=candles["datetime"],
-                    open=candles["open"],
-                    high=candles["high"],
-                    low=candles["low"],
-                    close=candles["close"],
-                    name="Price",
-                    increasing_line_color=BULL_COLOR,
-                    decreasing_line_color=BEAR_COLOR,
-                ), row=1, col=1)
-                colors_vol = [BULL_COLOR if c >= o else BEAR_COLOR
-                              for c, o in zip(candles["close"], candles["open"])]
-                fig_candle.add_trace(go.Bar(
-                    x=candles["datetime"], y=candles["volume"],
-                    marker_color=colors_vol, name="Volume", showlegend=False,
-                ), row=2, col=1)
-                fig_candle.update_layout(
-                    title=f"{selected_ticker} — Price & Volume",
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    height=360,
-                    margin=dict(t=40, b=20, l=20, r=20),
-                    xaxis_rangeslider_visible=False,
-                )
-                st.plotly_chart(fig_candle, use_container_width=True)
+                st.plotly_chart(build_candle_fig(candles, selected_ticker),
+                                use_container_width=True)
             else:
                 st.info("No candle data for this ticker.")
 
         # Impulse history table
-        imp_history = q("""
-            SELECT trade_date, direction, open, close, change_pct
-            FROM impulse_signals WHERE ticker = ?
-            ORDER BY trade_date DESC
-        """, [full_ticker])
+        imp_history = deepdive["history"]
 
         if not imp_history.empty:
             st.markdown("#### Impulse History")
-            imp_history["change_pct"] = imp_history["change_pct"].map(
-                lambda x: f"+{x:.2f}%" if x > 0 else f"{x:.2f}%"
-            )
-            imp_history["open"]  = imp_history["open"].map(lambda x: f"₹{x:,.2f}")
-            imp_history["close"] = imp_history["close"].map(lambda x: f"₹{x:,.2f}")
+            imp_history["change_pct"] = _fmt_pct(imp_history["change_pct"], decimals=2)
+            imp_history["open"]  = imp_history["open"].map("₹{:,.2f}".format)
+            imp_history["close"] = imp_history["close"].map("₹{:,.2f}".format)
             imp_history.columns = ["Date", "Direction", "Open", "Close", "Change %"]
             st.dataframe(imp_history, use_container_width=True, hide_index=True)
 
@@ -580,49 +939,27 @@ with tab4:
 with tab5:
     st.subheader("📋 Pipeline Run Log")
 
-    full_log = q("""
-        SELECT run_date, status, tickers_processed, candles_written, impulses_found, ran_at, error
-        FROM run_log ORDER BY run_date DESC LIMIT 90
-    """)
+    full_log = q(_RUN_LOG_SQL)
 
     if full_log.empty:
         st.info("No run log entries yet.")
     else:
-        full_log["run_date"] = pd.to_datetime(full_log["run_date"])
-
+        # DATE columns already arrive as datetime64 from _fetch_df — no
+        # pd.to_datetime re-parse needed here or for Tab 4's journey.
         col_l1, col_l2 = st.columns(2)
 
+        # The query already returns the last 90 runs in chronological
+        # order, so the charts take the frame as-is and only the table
+        # below flips it (an iloc view, not a sort).
         with col_l1:
             # Impulses found over time
-            fig_imp = px.area(
-                full_log.sort_values("run_date"),
-                x="run_date", y="impulses_found",
-                title="Impulses Found per Day",
-                color_discrete_sequence=["#f97316"],
-            )
-            fig_imp.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=250,
-                margin=dict(t=40, b=20, l=20, r=20),
-            )
-            st.plotly_chart(fig_imp, use_container_width=True)
+            st.plotly_chart(build_impulse_area(full_log[["run_date", "impulses_found"]]),
+                            use_container_width=True)
 
         with col_l2:
             # Candles written over time
-            fig_can = px.bar(
-                full_log.sort_values("run_date"),
-                x="run_date", y="candles_written",
-                title="Candles Written per Day",
-                color_discrete_sequence=["#3b82f6"],
-            )
-            fig_can.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=250,
-                margin=dict(t=40, b=20, l=20, r=20),
-            )
-            st.plotly_chart(fig_can, use_container_width=True)
+            st.plotly_chart(build_candles_bar(full_log[["run_date", "candles_written"]]),
+                            use_container_width=True)
 
         # Status badges
         success_count = (full_log["status"] == "success").sum()
@@ -632,11 +969,9 @@ with tab5:
             f"(last 90 days)"
         )
 
-        # Table with error column
-        show_log = full_log.copy()
-        show_log["Status"] = show_log["status"].map(
-            lambda s: "🟢 success" if s == "success" else "🔴 failed"
-        )
+        # Table with error column — newest first
+        show_log = full_log.iloc[::-1].copy()
+        show_log["Status"] = show_log["status"].map(STATUS_BADGE)
         show_log = show_log.rename(columns={
             "run_date": "Date",
             "tickers_processed": "Tickers",
@@ -651,9 +986,12 @@ with tab5:
             hide_index=True,
         )
 
-        # Failed runs with errors
-        failed = full_log[full_log["status"] == "failed"]
+        # Failed runs with errors — one markdown element for the whole
+        # list (newest first) instead of an st.error delta per row.
+        failed = full_log[full_log["status"] == "failed"].iloc[::-1]
         if not failed.empty:
             with st.expander("🔴 Failed runs detail"):
-                for _, row in failed.iterrows():
-                    st.error(f"**{row['run_date'].date()}** — {row['error']}")
+                st.markdown("\n\n".join(
+                    f"🔴 **{d.date()}** — {e}"
+                    for d, e in zip(failed["run_date"], failed["error"])
+                ))